@@ -2,31 +2,76 @@
 # Advent of Code 2022 - Day 11
 #######################################################################################################################
 
-from collections import Counter
+from __future__ import annotations
+from collections import Counter, deque
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from typing import NamedTuple
 import copy
+import functools
 import math
+import numpy as np
 import operator
 import re
 
 
+class WorryOperation(NamedTuple):
+    """
+    Worry operation compiled once from its text (e.g. "old * 19"), as an operator and its second operand
+    """
+    op: Callable[[int, int], int]
+    operand: int | None  # None when the operand is the old worry level itself (e.g. "old * old")
+
+    @classmethod
+    def compile(cls, worry_op: str) -> WorryOperation:
+        """
+        Compile the text of a worry operation
+
+        :param worry_op: Text of the operation (e.g. "old * 19")
+        :return: WorryOperation - Compiled operation
+        """
+        ops_dict = {
+            "+": operator.add,
+            "*": operator.mul
+        }
+        first_operand, op, second_operand = re.findall(r"(\w+) (.) (\w+)", worry_op)[0]
+        if first_operand != "old":
+            raise ValueError(f"Unsupported worry operation: {worry_op}")
+
+        return cls(ops_dict[op], None if second_operand == "old" else int(second_operand))
+
+    def as_function(self) -> Callable[[int], int]:
+        """
+        Get a function applying this operation to an old worry level
+
+        :return: Callable[[int], int] - Function from old worry level to new worry level
+        """
+        op, operand = self.op, self.operand
+        if operand is None:
+            return (lambda old: old + old) if op is operator.add else (lambda old: old * old)
+        return (lambda old: old + operand) if op is operator.add else (lambda old: old * operand)
+
+
 class Monkey:
     """
     Object-oriented implementation for Monkey behaviour:
     """
 
-    def __init__(self, index: int, items: list, worry_operation: str, test_divisor: int, throw_to: list) -> None:
+    def __init__(self, index: int, items: list, worry_operation: WorryOperation, test_divisor: int,
+                 throw_to: list) -> None:
         """
         Initialise Monkey object
 
         :param index: Index assigned to this monkey (e.g., 0)
         :param items: Items available for this monkey to inspect (e.g. [79, 98])
-        :param worry_operation: Operation to change worry level when monkey inspects item (e.g. old * 19)
+        :param worry_operation: Compiled operation to change worry level when monkey inspects item (e.g. old * 19)
         :param test_divisor: Divisor to test worry level divisibility - determines monkey to throw to (e.g. 13)
         :param throw_to: Monkeys to throw to for a True or False test result respectively (e.g. [2, 3])
         """
         self.index = index
-        self.items = items
+        self.items = deque(items)  # Items are always inspected and thrown from the front
         self.worry_operation = worry_operation
+        self._apply_worry_operation = worry_operation.as_function()
         self.test_divisor = test_divisor
         self.throw_to = throw_to
         self.inspect_count = 0  # Number of times this monkey has performed an inspection
@@ -58,16 +103,8 @@ class Monkey:
         """
         self.inspect_count += 1
 
-        # Replace references to 'old' in the operation with the current item being inspected (always the first)
-        worry_op = self.worry_operation.replace("old", str(self.items[0]))
-
-        # Apply worry operation
-        first_operand, op, second_operand = re.findall(r"(\w+) (.) (\w+)", worry_op)[0]
-        ops_dict = {
-            "+": operator.add,
-            "*": operator.mul
-        }
-        self.items[0] = ops_dict[op](int(first_operand), int(second_operand))
+        # Apply worry operation (compiled once when parsed) to the current item being inspected (always the first)
+        self.items[0] = self._apply_worry_operation(self.items[0])
 
         # Relief - rule = divide by three and round down
         if relief:
@@ -86,7 +123,30 @@ class Monkey:
 
         :param other: Monkey object to throw the currently inspected item to (i.e., first item in self.items)
         """
-        other.add_item(self.items.pop(0))
+        other.add_item(self.items.popleft())
+
+    def take_turn(self, monkeys: dict[int, Monkey], relief: bool = True, lcm: int = None) -> None:
+        """
+        Inspect and throw every item this monkey holds, in order - equivalent to repeatedly calling inspect() and
+        throw_item(), but without the per-item method call overheads
+
+        :param monkeys: Dictionary of monkey indexes to corresponding monkey objects (to throw to)
+        :param relief: Whether relief is applied after the item has been inspected
+        :param lcm: Lowest common multiple of all test divisors used across all monkeys (i.e., applying LCM trick)
+        """
+        items = self.items
+        apply_worry_operation = self._apply_worry_operation
+        divisor = self.test_divisor
+        to_true, to_false = (monkeys[index].items for index in self.throw_to)
+
+        self.inspect_count += len(items)
+        while items:
+            worry = apply_worry_operation(items.popleft())
+            if relief:
+                worry //= 3
+            if lcm:
+                worry %= lcm
+            (to_false if worry % divisor else to_true).append(worry)
 
     def __repr__(self) -> str:
         """
@@ -97,24 +157,174 @@ class Monkey:
         return f"Monkey: (ID={self.index}, Start Items={self.items}, Inspect Count={self.inspect_count})"
 
 
-def execute_rounds(monkeys: dict[int, Monkey], num_rounds: int, relief: bool = True, lcm: int = None) -> int:
+def trace_item(rules: tuple, monkey_index: int, worry: int, num_rounds: int, relief: bool = True,
+               lcm: int = None) -> tuple[list[int], tuple[int, int]]:
+    """
+    Follow a single item through the monkeys for the given number of rounds:
+    Items never affect each other, so an item's path only depends on its (monkey, worry) state at the start of a round.
+    With the LCM trick there are finitely many such states, so the state sequence must eventually repeat - once it does,
+    the inspection counts for the remaining rounds are extrapolated from the cycle rather than simulated.
+
+    :param rules: Per-monkey (worry operation, test divisor, throw to) rules, in monkey index order
+    :param monkey_index: Index of the monkey holding the item at the start
+    :param worry: Worry level of the item at the start
+    :param num_rounds: Number of rounds to execute
+    :param relief: Whether relief is applied after a monkey has inspected an item
+    :param lcm: Lowest common multiple of all test divisors used across all monkeys (i.e., applying LCM trick)
+    :return: tuple[list[int], tuple[int, int]] - Inspections of this item by each monkey, and final (monkey, worry)
+    """
+    operations = [worry_operation.as_function() for worry_operation, _, _ in rules]
+
+    state = (monkey_index, worry)
+    seen = {}  # (monkey, worry) state at the start of a round -> round number
+    states = []  # State at the start of each round
+    inspected_by = []  # Monkeys which inspected the item in each round, in order
+
+    while len(states) < num_rounds and state not in seen:
+        seen[state] = len(states)
+        states.append(state)
+
+        monkey, worry = state
+        round_inspectors = []
+        while True:  # Item is inspected again this round whenever it is thrown to a later monkey
+            round_inspectors.append(monkey)
+            _, divisor, throw_to = rules[monkey]
+            worry = operations[monkey](worry)
+            if relief:
+                worry //= 3
+            if lcm:
+                worry %= lcm
+            to_monkey = throw_to[0] if worry % divisor == 0 else throw_to[1]
+            if to_monkey < monkey:
+                break
+            monkey = to_monkey
+
+        inspected_by.append(round_inspectors)
+        state = (to_monkey, worry)
+
+    counts = [0] * len(rules)
+    if len(states) == num_rounds:  # No cycle within the rounds required
+        for round_inspectors in inspected_by:
+            for monkey in round_inspectors:
+                counts[monkey] += 1
+        return counts, state
+
+    # Rounds [cycle_start, len(states)) repeat forever
+    cycle_start = seen[state]
+    cycle_length = len(states) - cycle_start
+    full_cycles, remainder = divmod(num_rounds - cycle_start, cycle_length)
+
+    for round_num, round_inspectors in enumerate(inspected_by):
+        if round_num < cycle_start:
+            times = 1
+        else:
+            times = full_cycles + (1 if round_num - cycle_start < remainder else 0)
+        for monkey in round_inspectors:
+            counts[monkey] += times
+
+    return counts, states[cycle_start + remainder]
+
+
+def _execute_rounds_trajectories(monkeys: dict[int, Monkey], num_rounds: int, relief: bool, lcm: int,
+                                 workers: int = None) -> None:
+    """
+    Execute rounds by following each item independently with trace_item, spread across worker processes
+    Afterwards, each monkey holds its final items (though not necessarily in the same order as a round-by-round run)
+
+    :param monkeys: Dictionary of monkey indexes to corresponding monkey objects
+    :param num_rounds: Number of rounds to execute
+    :param relief: Whether relief is applied after a monkey has inspected an item
+    :param lcm: Lowest common multiple of all test divisors used across all monkeys (i.e., applying LCM trick)
+    :param workers: Number of worker processes (None = one per CPU, 1 = no worker processes)
+    """
+    ordered = [monkeys[index] for index in range(len(monkeys))]
+    rules = tuple((monkey.worry_operation, monkey.test_divisor, tuple(monkey.throw_to)) for monkey in ordered)
+    starts = [(monkey.index, item) for monkey in ordered for item in monkey.items]
+
+    trace = functools.partial(trace_item, rules, num_rounds=num_rounds, relief=relief, lcm=lcm)
+    if workers == 1:
+        results = [trace(monkey_index, worry) for monkey_index, worry in starts]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(trace, *zip(*starts)))
+
+    for monkey in ordered:
+        monkey.items.clear()
+    for counts, (final_monkey, final_worry) in results:
+        for monkey, count in zip(ordered, counts):
+            monkey.inspect_count += count
+        ordered[final_monkey].add_item(final_worry)
+
+
+def _execute_rounds_numpy(monkeys: dict[int, Monkey], num_rounds: int, relief: bool, lcm: int) -> None:
+    """
+    Execute rounds with all items held in one int64 NumPy array, alongside a parallel array of which monkey owns each
+    On each monkey's turn, its operation is applied to the masked subset of items it owns, and the owners are
+    reassigned with np.where on the divisibility test. Items thrown to a later monkey are still picked up this round.
+    Worry levels must fit in int64 - the LCM trick keeps them below lcm^2, otherwise only use for a few rounds.
+
+    :param monkeys: Dictionary of monkey indexes to corresponding monkey objects
+    :param num_rounds: Number of rounds to execute
+    :param relief: Whether relief is applied after a monkey has inspected an item
+    :param lcm: Lowest common multiple of all test divisors used across all monkeys (i.e., applying LCM trick)
+    """
+    ordered = [monkeys[index] for index in range(len(monkeys))]
+    worry = np.array([item for monkey in ordered for item in monkey.items], dtype=np.int64)
+    owner = np.array([monkey.index for monkey in ordered for _ in monkey.items], dtype=np.int64)
+    counts = np.zeros(len(ordered), dtype=np.int64)
+
+    for _ in range(num_rounds):
+        for monkey in ordered:
+            mask = owner == monkey.index
+            held = worry[mask]
+            counts[monkey.index] += held.size
+
+            operand = monkey.worry_operation.operand
+            held = monkey.worry_operation.op(held, held if operand is None else operand)
+            if relief:
+                held //= 3
+            if lcm:
+                held %= lcm
+
+            worry[mask] = held
+            owner[mask] = np.where(held % monkey.test_divisor == 0, monkey.throw_to[0], monkey.throw_to[1])
+
+    for monkey in ordered:
+        monkey.inspect_count += int(counts[monkey.index])
+        monkey.items = deque(int(item) for item in worry[owner == monkey.index])
+
+
+def execute_rounds(monkeys: dict[int, Monkey], num_rounds: int, relief: bool = True, lcm: int = None,
+                   engine: str = "monkeys", workers: int = None) -> int:
     """
     Execute required number of rounds:
     Iterate over the desired number of rounds
     Each round involves iterating over every monkey, with each monkey inspecting and acting on its items in order
 
+    Engines:
+    - "monkeys": Simulate round by round, monkey by monkey, as described above
+    - "trajectories": Follow each item on its own, with cycle detection, so huge numbers of rounds (e.g., 10^12) are
+        bounded by cycle length rather than round count (see trace_item)
+    - "numpy": Simulate round by round, but with every item in one NumPy array, so each monkey's turn is vectorised
+
     :param monkeys: Dictionary of monkey indexes to corresponding monkey objects
     :param num_rounds: Number of rounds to execute
     :param relief: Whether relief is applied after a monkey has inspected an item
     :param lcm: Lowest common multiple of all test divisors used across all monkeys (i.e., applying LCM trick)
+    :param engine: Execution strategy to use - "monkeys", "trajectories", or "numpy"
+    :param workers: Number of worker processes for the "trajectories" engine (None = one per CPU)
     :return int - 'Monkey Business' = product of the top two inspection counts
     """
-    for _ in range(num_rounds):
-        for monkey in monkeys.values():  # Iterate through monkeys in order
-            while monkey.has_items():  # Monkey inspects and throws until it has no more items
-                to_monkey_index = monkey.inspect(relief=relief, lcm=lcm)
-                to_monkey = monkeys[to_monkey_index]
-                monkey.throw_item(to_monkey)
+    if engine == "monkeys":
+        for _ in range(num_rounds):
+            for monkey in monkeys.values():  # Iterate through monkeys in order
+                monkey.take_turn(monkeys, relief=relief, lcm=lcm)  # Monkey inspects and throws until it has no items
+    elif engine == "trajectories":
+        _execute_rounds_trajectories(monkeys, num_rounds, relief, lcm, workers=workers)
+    elif engine == "numpy":
+        _execute_rounds_numpy(monkeys, num_rounds, relief, lcm)
+    else:
+        raise ValueError(f"Unknown engine: {engine}")
 
     # Get the two monkeys that have inspected the most
     monkey_inspect = Counter({monkey.index: monkey.inspect_count for monkey in monkeys.values()})
@@ -143,7 +353,7 @@ def parse_input(data: str) -> dict[int, Monkey]:
             if "items:" in line:
                 items = list(map(int, re.findall(r"(\d+)", line)))
             if "Operation:" in line:
-                worry_op = line.split("=")[-1].strip()
+                worry_op = WorryOperation.compile(line.split("=")[-1].strip())
             if "Test:" in line:
                 divisor = int(re.findall(r"\d+", line)[0])
             if "true:" in line:
@@ -180,6 +390,8 @@ def main():
     Goal is to determine monkey business after 20 rounds
     - Execute 20 rounds - iterating through each monkey, with each inspecting and throwing all its items
     - Determine the final inspect_count for each monkey and return the product of the two largest counts
+    - Worry operations are compiled once when parsed, and each monkey's items are held in a deque, since items are
+        always inspected and thrown from the front
 
     Part 2 Solution:
     Item worry level is no longer reduced after inspection
@@ -195,6 +407,9 @@ def main():
         And we're not dividing anymore, which would break congruence
         So, we only need to maintain a number which preserves the remainder, not the actual worry score
         So, we can just store % w (mod n), and for n we can use the LCM of all our divisors.
+    - With the LCM trick, each item is also independent of every other, with finitely many (monkey, worry) states
+        - So, follow each item on its own (in worker processes), until its state at the start of a round repeats
+        - The inspection counts then follow from the cycle, for any number of rounds (e.g., 10^12)
 
     NOTE: Credit for part 2 solution to 'derailed-dash' for explanation of applying congruence and LCM trick
     - https://github.com/derailed-dash/Advent-of-Code/blob/master/src/AoC_2022/d11_monkey_in_the_middle/monkey.py
@@ -213,7 +428,7 @@ def main():
     # Part 2:
     # Here, the LCM is actually the product of these numbers, since they are all prime - in general, we want to use LCM
     lcm = math.lcm(*[monkey.test_divisor for monkey in monkeys.values()])
-    monkey_business = execute_rounds(monkeys, 10000, relief=False, lcm=lcm)
+    monkey_business = execute_rounds(monkeys, 10000, relief=False, lcm=lcm, engine="trajectories")
     print(f"Worry levels are no longer divided by three after each item is inspected; "
           f"You'll need to find another way to keep your worry levels manageable."
           f"\nStarting again from the initial state in your puzzle input, "
@@ -4,6 +4,7 @@
 
 from __future__ import annotations
 from collections import deque
+from collections.abc import Callable
 from copy import deepcopy
 from dataclasses import dataclass
 
@@ -12,25 +13,16 @@ from dataclasses import dataclass
 class Point:
     """
     Point class:
-    A point knows how to return a list of all adjacent coordinates
+    A point is an (x, y) location in the Grid
     """
     x: int
     y: int
 
-    def neighbours(self) -> list[Point]:
-        """
-        Return all adjacent orthogonal (not diagonal) Points
-        """
-        return [Point(self.x + dx, self.y + dy)
-                for dx in range(-1, 2)
-                for dy in range(-1, 2)
-                if abs(dy) != abs(dx)
-                ]
-
 
 class Grid:
     """
     2D Grid class (comprised of Points):
+    Internally, cells are flat integer indices (y * x_size + x), with elevations and legal moves precomputed once
     """
 
     def __init__(self, grid_array: list[str]) -> None:
@@ -47,25 +39,65 @@ class Grid:
         self.start = self._get_point_for_elevation("S")
         self.goal = self._get_point_for_elevation("E")
 
-    def _all_points(self) -> list[Point]:
+        # Flat elevation array - start location is elevation 'a', and end location is elevation 'z'
+        self.elevations = [ord(char) for row in self.array for char in row.replace("S", "a").replace("E", "z")]
+
+        self._move_offsets, self._moves = self._build_moves(reverse=False)
+        self._reverse_move_offsets, self._reverse_moves = self._build_moves(reverse=True)
+        self._distances_to_goal: list[int | None] | None = None  # Computed on first use, then cached
+
+    def _build_moves(self, reverse: bool) -> tuple[list[int], list[int]]:
+        """
+        Build a CSR-style adjacency table of legal moves:
+        The cells we can move to from cell i are moves[offsets[i]:offsets[i + 1]]
+
+        :param reverse: If True, invert the climbing rule, giving the cells we could have moved to cell i from
+        :return: tuple[list[int], list[int]] - Offsets into the moves list for each cell, and the moves list itself
+        """
+        elevations = self.elevations
+        x_size, y_size = self.x_size, self.y_size
+        offsets = [0]
+        moves = []
+
+        for index, elevation in enumerate(elevations):
+            y, x = divmod(index, x_size)
+            neighbours = []
+            if x > 0:
+                neighbours.append(index - 1)
+            if x < x_size - 1:
+                neighbours.append(index + 1)
+            if y > 0:
+                neighbours.append(index - x_size)
+            if y < y_size - 1:
+                neighbours.append(index + x_size)
+
+            for neighbour in neighbours:
+                if reverse and elevations[neighbour] >= elevation - 1:
+                    moves.append(neighbour)
+                elif not reverse and elevations[neighbour] <= elevation + 1:
+                    moves.append(neighbour)
+            offsets.append(len(moves))
+
+        return offsets, moves
+
+    def index_of(self, point: Point) -> int:
         """
-        Get all points in the Grid as a list
+        Get the flat index of a point in the Grid
 
-        :return: list[Point] - List of Points comprising the grid
+        :param point: Point to get index for
+        :return: int - Flat index of the point
         """
-        points = [Point(x, y) for x in range(self.x_size) for y in range(self.y_size)]
-        return points
+        return point.y * self.x_size + point.x
 
-    def all_lowest_elevation_points(self) -> set[Point]:
+    def point_at(self, index: int) -> Point:
         """
-        Get all points at the lowest elevation in the Grid
+        Get the point for a flat index in the Grid
 
-        :return: set[Point] - Set of all lowest elevation points in the grid
+        :param index: Flat index to get point for
+        :return: Point - Point at the index
         """
-        low_points = {point for point in self._all_points()
-                      if self.array[point.y][point.x] == "a" or self.array[point.y][point.x] == "S"
-                      }
-        return low_points
+        y, x = divmod(index, self.x_size)
+        return Point(x, y)
 
     def _get_point_for_elevation(self, x: str) -> Point:
         """
@@ -89,35 +121,7 @@ class Grid:
         :param point: Point to retrieve elevation for
         :return int - Elevation at given point
         """
-        if point not in (self.start, self.goal):
-            return ord(self.array[point.y][point.x])
-        if point == self.start:
-            return ord("a")  # Start location is elevation 'a'
-        if point == self.goal:
-            return ord("z")  # End location is elevation 'z'
-
-    def _point_in_grid(self, point: Point) -> bool:
-        """
-        Check if a location is within the grid
-
-        :param point: Point to check if within grid for
-        :return bool - True if point within Grid, False otherwise
-        """
-        return 0 <= point.x < self.x_size and 0 <= point.y < self.y_size
-
-    def _valid_neighbours(self, location: Point):
-        """
-        Yield adjacent neighbour points:
-        We can move L, R, U, D by one, but only to locations that are no more than one higher than current elevation
-
-        :param location: Current location we are moving from
-        :return Yields valid neighbours we can move to from current location
-        """
-        current_elevation = self.elevation_at_point(location)
-
-        for neighbour in location.neighbours():
-            if self._point_in_grid(neighbour) and self.elevation_at_point(neighbour) <= current_elevation + 1:
-                yield neighbour
+        return self.elevations[self.index_of(point)]
 
     def get_path(self, start: Point) -> list[Point] | None:
         """
@@ -126,35 +130,77 @@ class Grid:
         :param start: Starting point to seek path from towards the end
         :return list[Point] | None - List of points comprising the path, or None if no valid path from this start point
         """
-        points_to_assess = deque()  # Points we want to get value and neighbours of
-        points_to_assess.append(start)  # First point to assess is start
+        offsets, moves = self._move_offsets, self._moves
+        start_index = self.index_of(start)
+        goal_index = self.index_of(self.goal)
 
-        curr_point = None
-        points_came_from = {start: None}
+        points_to_assess = deque([start_index])  # Points we want to get value and neighbours of
+        came_from = [-1] * len(self.elevations)
+        came_from[start_index] = start_index
 
         while points_to_assess:  # They should only ever be valid points
-            curr_point = points_to_assess.popleft()
+            curr_index = points_to_assess.popleft()
 
-            if curr_point == self.goal:  # We've reached the end
+            if curr_index == goal_index:  # We've reached the end
                 break
 
-            for neighbour in self._valid_neighbours(curr_point):
-                if neighbour not in points_came_from:  # We will need to assess this point
+            for neighbour in moves[offsets[curr_index]:offsets[curr_index + 1]]:
+                if came_from[neighbour] == -1:  # We will need to assess this point
                     points_to_assess.append(neighbour)
-                    points_came_from[neighbour] = curr_point
+                    came_from[neighbour] = curr_index
 
-        if curr_point != self.goal:
+        if came_from[goal_index] == -1:
             return None  # No valid path from this point
 
         # Recover the path
-        curr_point = self.goal
+        curr_index = goal_index
         path = []
-        while curr_point != start:
-            path.append(curr_point)
-            curr_point = points_came_from[curr_point]
+        while curr_index != start_index:
+            path.append(self.point_at(curr_index))
+            curr_index = came_from[curr_index]
 
         return path
 
+    def distances_to_goal(self) -> list[int | None]:
+        """
+        Single reverse BFS from the goal, giving the fewest steps from every point which can reach the goal
+        The search only runs once per Grid - later calls return the cached distances
+
+        :return: list[int | None] - Steps to reach the goal for each flat index, or None if there is no valid path
+        """
+        if self._distances_to_goal is not None:
+            return self._distances_to_goal
+
+        offsets, moves = self._reverse_move_offsets, self._reverse_moves
+        goal_index = self.index_of(self.goal)
+
+        points_to_assess = deque([goal_index])
+        distances = [None] * len(self.elevations)
+        distances[goal_index] = 0
+
+        while points_to_assess:
+            curr_index = points_to_assess.popleft()
+            next_distance = distances[curr_index] + 1
+
+            for neighbour in moves[offsets[curr_index]:offsets[curr_index + 1]]:
+                if distances[neighbour] is None:
+                    distances[neighbour] = next_distance
+                    points_to_assess.append(neighbour)
+
+        self._distances_to_goal = distances
+        return distances
+
+    def fewest_steps_from(self, is_start: Callable[[Point], bool]) -> int | None:
+        """
+        Fewest steps to the goal from any starting point satisfying the given predicate
+
+        :param is_start: Predicate specifying which points count as starting points
+        :return int | None - Fewest steps to the goal, or None if no starting point has a valid path
+        """
+        distances = self.distances_to_goal()
+        return min((steps for index, steps in enumerate(distances)
+                    if steps is not None and is_start(self.point_at(index))), default=None)
+
     def __repr__(self) -> str:
         """
         Custom string representation of the Grid, for debugging purposes
@@ -177,10 +223,13 @@ def main():
 
     Part 2:
     What is the shortest number of steps (path), given all starting locations `a` to the goal?
-    - Find the shortest path from all lowest points (given as "a")
-    - Apply the BFS for each start location
-    - Report the shortest path
-    - Many starting locations have no valid paths, which needs to be handled
+    - Rather than a BFS from every `a`, do a single BFS backwards from the goal (inverting the climbing rule)
+    - This gives the distance to the goal from every point, so both parts come from the one search
+    - Report the shortest distance over all lowest points (given as "a", or "S")
+    - Many starting locations have no valid paths, and simply have no distance (None)
+
+    Grid precomputes a flat elevation array and a CSR-style table of legal moves (forward and reverse) on creation,
+    so the searches only ever deal with integer indices rather than Points.
 
     NOTE: A faster search algorithm than BFS could have been used (e.g., informed A* search), but not necessary...
     """
@@ -190,20 +239,15 @@ def main():
     grid = Grid(data)
 
     # Part 1:
-    path = grid.get_path(grid.start)
-    part1_length = len(path)
+    distances = grid.distances_to_goal()
+    part1_length = distances[grid.index_of(grid.start)]
 
     print(f"What is the fewest steps required to move from your current position to the location that should get the "
           f"best signal?"
           f"\nAnswer: {part1_length}")
 
-    # Part 2:
-    start_points = grid.all_lowest_elevation_points()
-    part2_length = part1_length  # We know of at least one solution that must be improved upon, the solution from Part 1
-    for start in start_points:
-        path = grid.get_path(start)
-        if path:
-            part2_length = min(part2_length, len(path))
+    # Part 2 (reuses the cached distances from Part 1):
+    part2_length = grid.fewest_steps_from(lambda point: grid.elevation_at_point(point) == ord("a"))
 
     print(f"What is the fewest steps required to move starting from any square with elevation a to the location that "
           f"should get the best signal?"
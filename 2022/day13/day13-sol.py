@@ -3,157 +3,178 @@
 #######################################################################################################################
 
 from __future__ import annotations
-from ast import literal_eval  # Reading packet data made easy!
+from collections.abc import Iterator
+import re
 
+OPEN, CLOSE = -1, -2  # Packet tokens for the start and end of a list (packet ints are never negative)
+TOKEN_PATTERN = re.compile(rb"\d+|\[|\]")
 
-class Packet:
+
+def tokenize(line: bytes) -> Iterator[int]:
     """
-    Packet is made up of a value which is either a list or an int - lists can contain other lists
+    Lazily tokenize a packet line: OPEN for '[', CLOSE for ']', and each int as itself (commas are skipped)
+
+    :param line: Bytes of a single packet
+    :return: Iterator[int] - Packet tokens, in order, only scanned as far as they are consumed
     """
+    for match in TOKEN_PATTERN.finditer(line):
+        token = match.group()
+        if token == b"[":
+            yield OPEN
+        elif token == b"]":
+            yield CLOSE
+        else:
+            yield int(token)
+
 
-    def __init__(self, value: list | int) -> None:
-        """
-        Instantiate packet with a value that is either an int or a list
-
-        :param value: Value to add to this packet
-        """
-        self.value = value
-
-    def __lt__(self, other: Packet) -> bool:
-        """
-        Define the functionality of the less than (<) operator on Packets
-
-        :param other: Packet to compare to this
-        :return: bool - True if ordering conditions met between packets, False otherwise
-        """
-        # Base Case: Both are ints
-        if isinstance(self.value, int) and isinstance(other.value, int):
-            if self.value < other.value:
-                return True
-            if self.value > other.value:
-                return False
-
-        # Case: One val is int and one list
-        if isinstance(self.value, int) and isinstance(other.value, list):
-            new_item = Packet([self.value])  # Convert this int to list
-            return new_item < other
-        if isinstance(self.value, list) and isinstance(other.value, int):
-            new_item = Packet([other.value])  # Convert other int to list
-            return self < new_item
-
-        # Case: Both vals are lists
-        if isinstance(self.value, list) and isinstance(other.value, list):
-            # Take each item and compare it - zip will stop when it reaches the end of either list
-            compare_count = 0
-            for val in zip(self.value, other.value):
-                compare_count += 1
-                if val[0] == val[1]:
-                    continue  # If the same, continue to next item
-
-                return Packet(val[0]) < Packet(val[1])
-
-            # If here, then iterator terminated before finding a difference, so smaller list 'wins'
-            return len(self.value) < len(other.value)
-
-    def __repr__(self) -> str:
-        """
-        Packet is represented as a string simply by its value
-
-        :return: Formatted string, as described
-        """
-        return str(self.value)
-
-
-class Pair:
+def parse_packets(data: bytes) -> list[tuple[int, ...]]:
     """
-    Contains two Packets: left and right
+    Parse packet data once into the tokens of every packet - pairs are consecutive packets
+
+    :param data: Bytes containing all packet data to be parsed
+    :return: list[tuple[int, ...]] - Parsed list of packet tokens
     """
+    return [tuple(tokenize(line)) for line in data.splitlines() if line.strip()]
 
-    def __init__(self, left: Packet, right: Packet) -> None:
-        """
-        Initialise object for a pair of Packets
 
-        :param left: First packet in pair
-        :param right: Second packet in pair
-        """
-        self.left = left
-        self.right = right
+def list_depth(tokens: tuple[int, ...]) -> int:
+    """
+    Get how deeply lists are nested within a packet (e.g., [] is 1, [[1], 2] is 2)
 
-    def __repr__(self):
-        """
-        pair is represented as a string by simply showing its left and right values
+    :param tokens: Packet tokens
+    :return: int - Depth of list nesting
+    """
+    depth = max_depth = 0
+    for token in tokens:
+        if token == OPEN:
+            depth += 1
+            max_depth = max(max_depth, depth)
+        elif token == CLOSE:
+            depth -= 1
+
+    return max_depth
 
-        :return: Formatted string, as described
-        """
-        return f"Pair (l = '{self.left}', r = '{self.right}')"
 
+def packet_key(tokens: tuple[int, ...], leaf_depth: int) -> tuple[int, ...]:
+    """
+    Convert a packet into a flat token tuple, which compares directly (<, ==) the same way packets are ordered
+
+    Comparing an int to a list promotes the int to [int], and that never changes an ordering - so first wrap every int
+    in lists until it sits at leaf_depth. If leaf_depth is at least the list depth of every packet being compared, then
+    ints are only ever compared with ints, and lists with lists. The OPEN/CLOSE/int tokens then keep the ordering,
+    since CLOSE (end of list) is less than anything else and OPEN is never compared to an int.
 
-def parse_packets_pairs(data: str) -> list[Pair]:
+    :param tokens: Packet tokens
+    :param leaf_depth: Depth to wrap every int down to - the same for every packet being compared
+    :return: tuple[int, ...] - Packet key
     """
-    Parse packet data from string into list of Packet Pairs
+    key: list[int] = []
+    depth = 0
+
+    for token in tokens:
+        if token == OPEN:
+            depth += 1
+            key.append(OPEN)
+        elif token == CLOSE:
+            depth -= 1
+            key.append(CLOSE)
+        else:
+            wrap = leaf_depth - depth
+            key.extend([OPEN] * wrap)
+            key.append(token)
+            key.extend([CLOSE] * wrap)
+
+    return tuple(key)
+
+
+def compare_packet_tokens(left: Iterator[int], right: Iterator[int]) -> int:
+    """
+    Compare two packets token by token, without building either packet, stopping as soon as the order is decided
+
+    When an int meets a list, the int is promoted to [int] by replaying it as OPEN (matched), int, CLOSE.
 
-    :param data: String containing all packet data to be parsed
-    :return: list[Pair] - Parsed list of packet pairs
+    :param left: Left packet tokens
+    :param right: Right packet tokens
+    :return: int - Negative if left is before right, positive if after, or 0 if they are equal
     """
-    pairs: list[Pair] = []
-    blocks = data.split("\n\n")  # Split into blocks (i.e., packet pairs)
+    left_replay: list[int] = []  # Tokens to replay (as a stack) before reading on, after promoting an int
+    right_replay: list[int] = []
+
+    for left_token in iter(lambda: left_replay.pop() if left_replay else next(left, None), None):
+        right_token = right_replay.pop() if right_replay else next(right)
 
-    for block in blocks:
-        lines = block.splitlines()
+        if left_token == right_token:
+            continue  # Both OPEN, both CLOSE, or equal ints
 
-        left = Packet(literal_eval(lines[0]))
-        right = Packet(literal_eval(lines[1]))
-        pair = Pair(left, right)
+        if left_token == CLOSE:
+            return -1  # Left list ran out first
+        if right_token == CLOSE:
+            return 1  # Right list ran out first
 
-        pairs.append(pair)
+        if left_token == OPEN:  # Right is an int, so promote it to a list
+            right_replay.extend((CLOSE, right_token))
+        elif right_token == OPEN:  # Left is an int, so promote it to a list
+            left_replay.extend((CLOSE, left_token))
+        else:
+            return left_token - right_token
 
-    return pairs
+    return 0
 
 
-def parse_packets_all(data: str) -> list[Packet]:
+def count_right_order_pairs(input_file_str: str) -> int:
     """
-    Parse packet data into a list of all Packets
+    Stream a packet file, summing the (1-indexed) indices of the pairs already in the right order
+    Only one line is held at a time, and each pair is only tokenized as far as is needed to decide its order
 
-    :param data: String containing all packet data to be parsed
-    :return: list[Packet] - Parsed list of packets
+    :param input_file_str: Location of file to read packets from
+    :return: int - Sum of the indices of pairs in the right order
     """
-    lines = data.splitlines()
-    return [Packet(literal_eval(line)) for line in lines if line]
+    total = 0
+
+    with open(input_file_str, mode="rb") as input_file:
+        lines = (line for line in input_file if line.strip())
+        for i, (left_line, right_line) in enumerate(zip(lines, lines), start=1):
+            if compare_packet_tokens(tokenize(left_line), tokenize(right_line)) < 0:
+                total += i
+
+    return total
 
 
 def main():
     """
     Input contains blocks, where each block is a pair.
     Each 'packet' in the pair is a list or an int. Lists can contain other lists.
-    So clearly, recursion is going to be involved.
 
     Part 1 Solution:
     How many pairs are in the right order?
-    - Read in each 'packet' using ast.literal_eval - this will automatically store as list or int
-    - Create a Packet class that stores this item, and which implements __lt__ so that we can compare according to rules
-      - The __lt__() method compares self with other
-      - It is recursive:
-        The base case is when we're comparing int values
-        Otherwise, we're either converting an int on one side to list and comparing, or iterating a list and comparing
-    - Finally, for each pair, compare and count how many times L < R
+    - Read in each 'packet' with a hand-written tokenizer, which turns it into OPEN / CLOSE / int tokens
+    - Convert each packet once into a flat key (see packet_key): every int is wrapped in lists down to the same depth,
+      so that ints are only ever compared with ints, and the keys then compare with plain tuple <
+    - Finally, for each pair, compare keys and sum the indices of the pairs where L < R
+    - For very large packet files, count_right_order_pairs streams the file instead, comparing token by token
+      (see compare_packet_tokens) and stopping as soon as each pair's order is decided
 
     Part 2 Solution:
     Ignore pairs and get all the packets
     Add two special 'divider' packets
     Then put all the packets in the right order, find the (1-indexed) index locations of the two divider packets
     Return the product of these two indexes
-    - Our Item class is already sortable since we implemented __lt__().
-    - So, read in all items, sort, and find the dividers.
+    - Reuse the packets (and keys) parsed for Part 1
+    - No need to actually sort: a divider's position is one more than the number of packets whose key is less than it
     """
-    with open("day13-input.txt", mode="rt") as f:
+    with open("day13-input.txt", mode="rb") as f:
         data = f.read()
 
-    # Part 1:
-    pairs = parse_packets_pairs(data)
+    # Parse once, for both parts, and convert every packet (and the dividers) into a directly comparable key
+    packets = parse_packets(data)
+    dividers = [tuple(tokenize(b"[[2]]")), tuple(tokenize(b"[[6]]"))]
+    leaf_depth = max(list_depth(packet) for packet in packets + dividers)
+    keys = [packet_key(packet, leaf_depth) for packet in packets]
 
+    # Part 1:
     right_order = []
-    for i, pair in enumerate(pairs, start=1):
-        if pair.left < pair.right:
+    for i, (left, right) in enumerate(zip(keys[0::2], keys[1::2]), start=1):
+        if left < right:
             right_order.append(i)  # Only need ordering of packet indices, don't need to actually order packets
 
     part1_sol = sum(right_order)
@@ -162,17 +183,11 @@ def main():
           f"\nAnswer: {part1_sol}")
 
     # Part 2
-    all_packets = parse_packets_all(data)
-
-    div_two, div_six = Packet([[2]]), Packet([[6]])  # Add divider packets, as required
-    all_packets.append(div_two)
-    all_packets.append(div_six)
-
-    sorted_items = sorted(all_packets)  # Can sort all packets as the __lt__ operator is defined
+    div_two, div_six = (packet_key(divider, leaf_depth) for divider in dividers)
 
-    # Retrieve 1-indexed positions of the divider packets:
-    loc_div_two = sorted_items.index(div_two) + 1
-    loc_div_six = sorted_items.index(div_six) + 1
+    # No need to sort - a divider's (1-indexed) position is one more than the number of packets before it
+    loc_div_two = sum(1 for key in keys if key < div_two) + 1
+    loc_div_six = sum(1 for key in keys if key < div_six) + 2  # [[2]] is also before [[6]]
 
     part2_sol = loc_div_two * loc_div_six
     print(f"Organize all of the packets into the correct order."
@@ -43,69 +43,119 @@ def cave_bottom(cave: dict) -> int:
     return bottom_y
 
 
-def drop_sand(cave: dict) -> bool:
+class DenseCave:
     """
-    Simulates the dropping of a sand grain in the cave
-
-    :param cave: The case to drop the sand through
-    :return: bool - True if sand rests anywhere but the sand origin, False otherwise (i.e., no rest or at origin)
-    """
-    x = SAND_ORIGIN[0]
-
-    cave_bottom_y = cave_bottom(cave)
-    for y in range(cave_bottom_y):
-        if (x, y + 1) not in cave:  # Move Down?
-            pass
-        elif (x - 1, y + 1) not in cave:  # Move Diagonal-Left Down?
-            x -= 1
-        elif (x + 1, y + 1) not in cave:  # Move Diagonal-Right Down?
-            x += 1
-        else:  # Sand comes to rest
-            cave[(x, y)] = SAND
-            return (x, y) != SAND_ORIGIN
-
-    return False
-
-
-def add_cave_floor(cave: dict) -> None:
+    Cave stored as a dense bytearray (one byte per tile, row-major), sized from the parsed rock bounds
+    Sand can only move one column sideways per row it falls, so the cave never needs to be wider than the sand triangle
     """
-    Adds a bottom to the cave floor at "two plus the highest y coordinate"
 
-    :param cave: Cave to add floor to
+    def __init__(self, cave: dict, has_abyss: bool) -> None:
+        """
+        Build the dense cave from the parsed rock co-ordinates
+
+        :param cave: The cave dict containing rock co-ordinates
+        :param has_abyss: Whether the bottom of the cave is an abyss, or the cave floor
+        """
+        self.has_abyss = has_abyss
+        self.bottom_y = cave_bottom(cave)  # Cached once, rather than recomputed per grain
+        self.height = self.bottom_y + 3  # Room for the cave floor at "two plus the highest y coordinate"
+
+        origin_x = SAND_ORIGIN[0]
+        self.min_x = min(min(x for x, _ in cave), origin_x - self.height) - 1
+        max_x = max(max(x for x, _ in cave), origin_x + self.height) + 1
+        self.width = max_x - self.min_x + 1
+
+        self.tiles = bytearray(b"." * (self.width * self.height))
+        for (x, y), tile in cave.items():
+            self.tiles[self.index(x, y)] = ord(tile)
+
+        if not has_abyss:  # Add the cave floor across the full width
+            floor_start = self.index(self.min_x, self.bottom_y + 2)
+            self.tiles[floor_start:floor_start + self.width] = ROCK.encode() * self.width
+
+    def index(self, x: int, y: int) -> int:
+        """
+        Get the index of a co-ordinate in the tiles bytearray
+
+        :param x: X co-ordinate
+        :param y: Y co-ordinate
+        :return: int - Index into tiles
+        """
+        return y * self.width + (x - self.min_x)
+
+    def fill(self) -> int:
+        """
+        Simulate the falling of sand within the cave:
+        Keep the path of the previous grain on a stack; the next grain follows the same path until the tile the last
+        grain came to rest on, so each new grain resumes from the last open tile on the path instead of the origin
+
+        :return: int - Number of units of sand that come to rest
+        """
+        tiles, width = self.tiles, self.width
+        empty = ord(".")
+        sand = ord(SAND)
+        abyss_index = self.bottom_y * width  # Any tile at or below the lowest rock falls into the abyss
+
+        path = [self.index(*SAND_ORIGIN)]
+        rested = 0
+
+        while path:
+            curr = path[-1]
+            if self.has_abyss and curr >= abyss_index:
+                break  # Sand flows into the abyss below, and so will every grain after it
+
+            below = curr + width
+            if tiles[below] == empty:  # Move Down?
+                path.append(below)
+            elif tiles[below - 1] == empty:  # Move Diagonal-Left Down?
+                path.append(below - 1)
+            elif tiles[below + 1] == empty:  # Move Diagonal-Right Down?
+                path.append(below + 1)
+            else:  # Sand comes to rest - the next grain resumes from the tile before this one
+                tiles[curr] = sand
+                rested += 1
+                path.pop()
+
+        return rested
+
+
+def sweep_floor_fill(cave: dict) -> int:
     """
-    bottom_y = cave_bottom(cave)
-    for x in range(-10 * bottom_y, 10 * bottom_y):  # Safe-ish guess at cave width that causes it to fill to sand origin
-        cave[x, bottom_y + 2] = ROCK
-
+    Count the sand that comes to rest with a cave floor, without dropping any grains:
+    With a floor, sand fills exactly the tiles reachable from the origin by moving down, or diagonally down, without
+    passing through rock. So each row's filled tiles (as a bitmask) are the row above spread by one in each direction,
+    minus the rocks in this row.
 
-def simulate(has_abyss: bool, cave: dict) -> dict:
+    :param cave: The cave dict containing rock co-ordinates
+    :return: int - Number of units of sand that come to rest
     """
-    Simulate the falling of sand within the cave
+    floor_y = cave_bottom(cave) + 2
+    origin_x, origin_y = SAND_ORIGIN
+    min_x = origin_x - floor_y  # Sand can never spread further than this before reaching the floor
 
-    :param has_abyss: Whether the bottom of the cave is an abyss, or the cave floor
-    :param cave: Cave dict to simulate sand falling through
-    :return: State of the cave after sand falling simulated (i.e., sand falling into abyss now, or cave is full)
-    """
-    if not has_abyss:
-        add_cave_floor(cave)
+    rock_rows = [0] * floor_y
+    for (x, y), tile in cave.items():
+        if tile == ROCK and y < floor_y and x >= min_x:
+            rock_rows[y] |= 1 << (x - min_x)
 
-    while drop_sand(cave):
-        pass  # Just needs to simulate falling sand and cave state is mutated
+    row = (1 << (origin_x - min_x)) & ~rock_rows[origin_y]
+    rested = row.bit_count()
+    for y in range(origin_y + 1, floor_y):
+        row = (row | (row << 1) | (row >> 1)) & ~rock_rows[y]
+        rested += row.bit_count()
 
-    return cave
+    return rested
 
 
 def main():
     cave = parse_cave_lines("day14-input.txt")
 
-    part1_cave = simulate(True, cave).values()  # Simulate with abyss
-    part1_sol = sum(1 for cave_tile in part1_cave if cave_tile == SAND)
+    part1_sol = DenseCave(cave, has_abyss=True).fill()  # Simulate with abyss
     print(f"Using your scan, simulate the falling sand."
           f"\nHow many units of sand come to rest before sand starts flowing into the abyss below?"
           f"\nAnswer: {part1_sol}")
 
-    part2_cave = simulate(False, cave).values()  # Simulate with cave floor
-    part2_sol = sum(1 for cave_tile in part2_cave if cave_tile == SAND)
+    part2_sol = sweep_floor_fill(cave)  # Sweep row by row down to the cave floor
     print(f"Using your scan, simulate the falling sand until the source of the sand becomes blocked."
           f"\nHow many units of sand come to rest?"
           f"\nAnswer: {part2_sol}")
@@ -3,7 +3,7 @@
 #######################################################################################################################
 
 import re
-from typing import Tuple, Set, List, NamedTuple
+from typing import Iterator, Tuple, Set, List, NamedTuple
 
 
 class Point(NamedTuple):
@@ -14,14 +14,6 @@ class Point(NamedTuple):
     y: int
 
 
-class Line(NamedTuple):
-    """
-    Line is represented by gradient, m, and intersect, b
-    """
-    m: float
-    b: float
-
-
 class Range(NamedTuple):
     """
     Range of ints from start to end
@@ -30,6 +22,16 @@ class Range(NamedTuple):
     end: int
 
 
+class Rect(NamedTuple):
+    """
+    Rectangle of ints in rotated (u, v) = (x + y, x - y) co-ordinates, with inclusive bounds
+    """
+    u_start: int
+    u_end: int
+    v_start: int
+    v_end: int
+
+
 def manhattan_dist(a: Point, b: Point) -> int:
     """
     Compute the Manhattan distance between two Points
@@ -43,100 +45,182 @@ def manhattan_dist(a: Point, b: Point) -> int:
 
 def is_range_overlap(a: Range, b: Range) -> bool:
     """
-    Determine whether two ranges overlap
-    Two ranges overlap if the end of one range is after the start of another
+    Determine whether two (inclusive) ranges overlap, or touch such that they can be combined into one range
+    Two ranges overlap if each one starts no later than one after the end of the other
 
     :param a: First Range
     :param b: Second Range
     :return: bool - True if ranges overlap, False otherwise
     """
-    return a.end > b.start or a.start < b.end
+    return a.start <= b.end + 1 and b.start <= a.end + 1
 
 
 def combine_ranges(ranges: List[Range]) -> List[Range]:
     """
-    Combine a list of ranges to remove overlapping ranges (Part 1 utility method)
+    Combine a list of ranges to remove overlapping ranges:
+    Sort once by start, then merge in a single pass, since a range can only overlap the last merged range
 
     :param ranges: List of ranges to combine
-    :return: List[Range] -
+    :return: List[Range] - Disjoint ranges covering the same positions, sorted by start
     """
-    new_ranges: List[Range] = []
-    ranges_0: Range = ranges.pop(0)
+    combined: List[Range] = []
 
-    while len(ranges) > 1:
-        ranges_1: Range = ranges.pop(0)
-        was_consumed: bool = False
+    for curr_range in sorted(ranges):
+        if combined and is_range_overlap(combined[-1], curr_range):
+            if curr_range.end > combined[-1].end:
+                combined[-1] = Range(combined[-1].start, curr_range.end)
+        else:
+            combined.append(curr_range)
 
-        while is_range_overlap(ranges_0, ranges_1):
-            ranges_0 = Range(min(ranges_0.start, ranges_1.start), max(ranges_0.end, ranges_1.end))
-            if ranges:
-                ranges_1 = ranges.pop(0)
-            else:
-                break
-            was_consumed = True
+    return combined
 
-        new_ranges.append(ranges_0)
 
-        if was_consumed:
-            if ranges:
-                ranges_0 = ranges.pop(0)
-        else:
-            ranges_0 = ranges_1
+def parse_sensor_beacons(input_file_str: str) -> List[Tuple[Point, Point]]:
+    """
+    Parse the sensor and closest beacon positions from file
 
-    return new_ranges
+    :param input_file_str: Location of file to read sensors from
+    :return: List[Tuple[Point, Point]] - List of (sensor, closest beacon) pairs
+    """
+    sensor_beacons: List[Tuple[Point, Point]] = []
+
+    with open(input_file_str, "r") as input_file:
+        for line in input_file:
+            sensor_x, sensor_y, beacon_x, beacon_y = map(int, re.findall(r"-?\d+", line))
+            sensor_beacons.append((Point(sensor_x, sensor_y), Point(beacon_x, beacon_y)))
 
+    return sensor_beacons
 
-def line_intersection(line_1: Line, line_2: Line) -> Point:
+
+def row_coverage(sensor_beacons: List[Tuple[Point, Point]], row: int) -> List[Range]:
     """
-    Calculate the intersection of two lines (Part 2 utility method)
+    Query the positions covered by any sensor on a given row
 
-    :param line_1: First line
-    :param line_2: Second line
-    :return: Point - Line intersection
+    :param sensor_beacons: List of (sensor, closest beacon) pairs
+    :param row: Row (y co-ordinate) to query
+    :return: List[Range] - Disjoint ranges of covered positions on the row, sorted by start
     """
-    x = (line_1.b - line_2.b) / (line_2.m - line_1.m)
-    y = (line_1.m * x) + line_1.b
+    ranges: List[Range] = []
 
-    return Point(round(x), round(y))
+    for sensor, beacon in sensor_beacons:
+        flex_along_row = manhattan_dist(sensor, beacon) - abs(row - sensor.y)
 
+        if flex_along_row >= 0:
+            ranges.append(Range(sensor.x - flex_along_row, sensor.x + flex_along_row))
 
-def part_1() -> int:
+    return combine_ranges(ranges)
+
+
+def count_covered(ranges: List[Range]) -> int:
     """
-    Part 1 Solution:
+    Count the positions covered by a list of disjoint ranges
 
-    :return: int - Number of positions that cannot contain a beacon
+    :param ranges: Disjoint ranges, as returned by combine_ranges
+    :return: int - Number of positions covered
     """
-    sensor_beacons: Set[Tuple[Point, Point]] = set()
-    beacons: Set[Point] = set()
+    return sum(r.end + 1 - r.start for r in ranges)
 
-    # Read input from file:
-    with open("day15-input.txt", "r") as input_file:
-        for line in input_file:
-            sensor_x, sensor_y, beacon_x, beacon_y = map(int, re.findall("-?\d+", line))
-            sensor = Point(sensor_x, sensor_y)
-            beacon = Point(beacon_x, beacon_y)
-            sensor_beacons.add((sensor, beacon))
-            beacons.add(beacon)
 
-    row = 2000000
-    ranges: List[Range] = []
+def uncovered_in_band(sensor_beacons: List[Tuple[Point, Point]], rows: range, lo: int, hi: int) -> Iterator[Point]:
+    """
+    Batch-evaluate a band of rows, yielding every position in [lo, hi] on those rows not covered by any sensor
+
+    :param sensor_beacons: List of (sensor, closest beacon) pairs
+    :param rows: Rows (y co-ordinates) to scan
+    :param lo: Lowest x co-ordinate to consider
+    :param hi: Highest x co-ordinate to consider
+    :return: Iterator[Point] - Uncovered positions, in row order
+    """
+    for row in rows:
+        x = lo
+        for r in row_coverage(sensor_beacons, row):
+            if r.end < x:
+                continue
+            if r.start > hi:
+                break
+            yield from (Point(gap_x, row) for gap_x in range(x, r.start))
+            x = r.end + 1
+        yield from (Point(gap_x, row) for gap_x in range(x, hi + 1))
+
+
+def subtract_rect(rect: Rect, other: Rect) -> List[Rect]:
+    """
+    Subtract one rectangle from another (Part 2 utility method)
+
+    :param rect: Rectangle to subtract from
+    :param other: Rectangle to subtract
+    :return: List[Rect] - Up to four disjoint rectangles covering the part of rect not covered by other
+    """
+    if (other.u_start > rect.u_end or other.u_end < rect.u_start or
+            other.v_start > rect.v_end or other.v_end < rect.v_start):
+        return [rect]  # No overlap
+
+    pieces: List[Rect] = []
+    if rect.u_start < other.u_start:  # Strip before other, along u
+        pieces.append(Rect(rect.u_start, other.u_start - 1, rect.v_start, rect.v_end))
+    if rect.u_end > other.u_end:  # Strip after other, along u
+        pieces.append(Rect(other.u_end + 1, rect.u_end, rect.v_start, rect.v_end))
+
+    # What's left spans the overlapping u values, so only needs cutting along v
+    u_start, u_end = max(rect.u_start, other.u_start), min(rect.u_end, other.u_end)
+    if rect.v_start < other.v_start:
+        pieces.append(Rect(u_start, u_end, rect.v_start, other.v_start - 1))
+    if rect.v_end > other.v_end:
+        pieces.append(Rect(u_start, u_end, other.v_end + 1, rect.v_end))
+
+    return pieces
+
+
+def uncovered_cells(sensor_beacons: List[Tuple[Point, Point]], lo: int, hi: int) -> List[Point]:
+    """
+    Find every position in the square [lo, hi] x [lo, hi] not covered by any sensor (Part 2 utility method)
+
+    In rotated co-ordinates (u, v) = (x + y, x - y), each sensor's diamond becomes an axis-aligned square, so we
+    subtract those squares from the search area's bounding box, and then only enumerate what's left. The work depends
+    on the number of sensors (and of uncovered cells), not on the co-ordinate range.
+
+    :param sensor_beacons: List of (sensor, closest beacon) pairs
+    :param lo: Lowest x and y co-ordinate to consider
+    :param hi: Highest x and y co-ordinate to consider
+    :return: List[Point] - All uncovered positions (empty if there are none)
+    """
+    remaining: List[Rect] = [Rect(2 * lo, 2 * hi, lo - hi, hi - lo)]
 
     for sensor, beacon in sensor_beacons:
-        m_dist = manhattan_dist(sensor, beacon)
-        dist_to_row = abs(row - sensor.y)
+        dist = manhattan_dist(sensor, beacon)
+        u, v = sensor.x + sensor.y, sensor.x - sensor.y
+        square = Rect(u - dist, u + dist, v - dist, v + dist)
+        remaining = [piece for rect in remaining for piece in subtract_rect(rect, square)]
+
+    cells: List[Point] = []
+    for rect in remaining:
+        # Clip to the u values where the rectangle meets the search square (a diamond in rotated co-ordinates)
+        u_start = max(rect.u_start, 2 * lo, rect.v_start + 2 * lo, 2 * lo - rect.v_end)
+        u_end = min(rect.u_end, 2 * hi, 2 * hi - rect.v_start, rect.v_end + 2 * hi)
+
+        for u in range(u_start, u_end + 1):
+            v_start = max(rect.v_start, 2 * lo - u, u - 2 * hi)
+            v_end = min(rect.v_end, 2 * hi - u, u - 2 * lo)
+            v_start += (u - v_start) % 2  # u and v must share parity to map back to an integer x and y
+
+            for v in range(v_start, v_end + 1, 2):
+                cells.append(Point((u + v) // 2, (u - v) // 2))
 
-        if m_dist >= dist_to_row:
-            flex_along_row = abs(m_dist - dist_to_row)
-            cov_along_row = Range(sensor.x - flex_along_row, sensor.x + flex_along_row)
-            ranges.append(cov_along_row)
+    return cells
+
+
+def part_1() -> int:
+    """
+    Part 1 Solution:
 
-    ranges = sorted(ranges, key=lambda curr_range: curr_range.start)
-    ranges = combine_ranges(ranges)
+    :return: int - Number of positions that cannot contain a beacon
+    """
+    sensor_beacons = parse_sensor_beacons("day15-input.txt")
+    beacons: Set[Point] = {beacon for _, beacon in sensor_beacons}
 
-    count = 0
-    for r in ranges:
-        count += r.end + 1 - r.start
-    count -= len([beacon for beacon in beacons if beacon.y == row])
+    row = 2000000
+    count = count_covered(row_coverage(sensor_beacons, row))
+    count -= len([beacon for beacon in beacons if beacon.y == row])  # Beacons on the row are always covered
 
     return count
 
@@ -150,43 +234,13 @@ def part_2():
 
     :return: int - Tuning frequency
     """
-    lines: Set[Line] = set()
+    sensor_beacons = parse_sensor_beacons("day15-input.txt")
 
-    # Read input from file:
-    with open("day15-input.txt", "r") as input_file:
-        for line in input_file:
-            sensor_x, sensor_y, beacon_x, beacon_y = map(int, re.findall("-?\d+", line))
-            sensor = Point(sensor_x, sensor_y)
-            beacon = Point(beacon_x, beacon_y)
-            dist = manhattan_dist(sensor, beacon)
-            points: List[Point] = [
-                Point(sensor.x + dist, sensor.y),
-                Point(sensor.x - dist, sensor.y),
-                Point(sensor.x, sensor.y + dist),
-                Point(sensor.x, sensor.y - dist),
-            ]
-
-            for a, b in [(a, b) for i, a in enumerate(points) for b in points[i + 1:]]:
-                if not a.x == b.x and not a.y == b.y:
-                    m = (a.x - b.x) / (a.y - b.y)
-                    b = a.y - m * a.x
-                    lines.add(Line(m, b))
-
-    line_pairs: Set[Tuple[Line, Line]] = set()
-
-    for line_1 in lines:
-        for line_2 in lines:
-            if line_1 is not line_2:
-                if line_1.m == line_2.m and abs(line_1.b - line_2.b) == 2 and line_1.b != line_2.b:
-                    line_pairs.add((
-                        min(line_1, line_2, key=lambda x: x.b),
-                        max(line_1, line_2, key=lambda x: x.b)
-                    ))
-
-    pairs: List[Tuple[Line, Line]] = sorted(list(line_pairs), key=lambda x: x[0].b)
-    intersection: Point = line_intersection(pairs[0][1], pairs[1][0])  # Intersection of lower line from each pair
-
-    return intersection.x * 4_000_000 + intersection.y  # Tuning frequency
+    cells = uncovered_cells(sensor_beacons, 0, 4_000_000)
+    if len(cells) != 1:
+        raise ValueError(f"Expected exactly one possible position for the distress beacon, found {len(cells)}")
+
+    return cells[0].x * 4_000_000 + cells[0].y  # Tuning frequency
 
 
 def main():
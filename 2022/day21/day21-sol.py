@@ -3,6 +3,7 @@
 #######################################################################################################################
 
 from __future__ import annotations
+from fractions import Fraction
 import operator
 
 
@@ -14,72 +15,129 @@ OPS = {
 }
 
 
-def compute(monkeys: dict, monkey_name: str) -> int | None:
+def evaluation_order(monkeys: dict, monkey_name: str) -> list[str]:
     """
-    Compute the resulting yelled value for a given monkey
+    Topologically order the monkeys a given monkey depends on, so that each monkey comes after those it waits on
+
+    :param monkeys: Dictionary of monkey names to their corresponding operations
+    :param monkey_name: Name of the monkey being computed (last in the order)
+    :return: list[str] - Names of monkeys, in an order they can be evaluated in
+    """
+    order = []
+    visited = set()
+    to_visit = [(monkey_name, False)]
+
+    while to_visit:
+        name, waited_on = to_visit.pop()
+        if waited_on:  # Every monkey this one waits on is already ordered
+            order.append(name)
+            continue
+        if name in visited:
+            continue
+
+        visited.add(name)
+        to_visit.append((name, True))
+        yell = monkeys[name]
+        if isinstance(yell, list):
+            m1, _, m2 = yell
+            to_visit.extend((m, False) for m in (m2, m1) if m not in visited)
+
+    return order
+
+
+def evaluate(monkeys: dict, monkey_name: str) -> dict[str, int | None]:
+    """
+    Evaluate every monkey a given monkey depends on, once each, in topological order
 
     :param monkeys: Dictionary of monkey names to their corresponding operations
     :param monkey_name: Name of the monkey being computed
-    :return: int | None - What the monkey yells as a result of compute, None if cannot compute yet
+    :return: dict[str, int | None] - What each monkey yells, or None if it depends on 'humn' (cannot compute yet)
     """
-    yell = monkeys[monkey_name]
+    values = {}
 
-    # Base Case: Monkey has what it needs and can simply yell its number
-    if yell is None or isinstance(yell, int):
-        return yell
+    for name in evaluation_order(monkeys, monkey_name):
+        yell = monkeys[name]
 
-    # Recursive Step: Monkey needs to wait on the result of other monkeys yelling first
-    m1, op, m2 = yell
-    s1 = compute(monkeys, m1)
-    s2 = compute(monkeys, m2)
+        if yell is None or isinstance(yell, int):  # Monkey can simply yell its number (or is 'humn')
+            values[name] = yell
+        else:  # Monkeys this one waits on have already been evaluated
+            m1, op, m2 = yell
+            s1, s2 = values[m1], values[m2]
+            values[name] = None if s1 is None or s2 is None else OPS[op](s1, s2)
 
-    if s1 and s2:
-        return OPS[op](s1, s2)
-    else:
-        return None
+    return values
 
 
-def solve(monkeys: dict, monkey_name: str, target: int) -> int:
+def compute(monkeys: dict, monkey_name: str) -> int | None:
     """
-    Find the number 'humn' must yell to pass root's equality test
+    Compute the resulting yelled value for a given monkey
 
     :param monkeys: Dictionary of monkey names to their corresponding operations
     :param monkey_name: Name of the monkey being computed
-    :param target: Used to force operators to match on both sides of root's equality check
-    :return: int - Number we ('humn') must yell to pass root's equality test
+    :return: int | None - What the monkey yells as a result of compute, None if cannot compute yet
     """
-    yell = monkeys[monkey_name]
+    return evaluate(monkeys, monkey_name)[monkey_name]
 
-    # Base Case: Monkey has what it needs and can simply yell their number, or 'humn' simply yells target
-    if isinstance(yell, int):
-        return yell
-    if yell is None:
-        return target
 
-    # Recursive Step(s):
-    m1, op, m2 = yell
-    s1 = compute(monkeys, m1)
-    s2 = compute(monkeys, m2)
+def linear_forms(monkeys: dict, monkey_name: str) -> dict[str, tuple[Fraction, Fraction]]:
+    """
+    Evaluate every monkey a given monkey depends on as a linear function a * humn + b, in one bottom-up pass
+    Coefficients are exact rationals, so no division is ever truncated along the way
+
+    :param monkeys: Dictionary of monkey names to their corresponding operations ('humn' as None)
+    :param monkey_name: Name of the monkey being computed
+    :return: dict[str, tuple[Fraction, Fraction]] - Coefficients (a, b) of what each monkey yells, in terms of humn
+    """
+    forms = {}
+
+    for name in evaluation_order(monkeys, monkey_name):
+        yell = monkeys[name]
+
+        if yell is None:  # 'humn' yells humn = 1 * humn + 0
+            forms[name] = (Fraction(1), Fraction(0))
+            continue
+        if isinstance(yell, int):
+            forms[name] = (Fraction(0), Fraction(yell))
+            continue
+
+        m1, op, m2 = yell
+        (a1, b1), (a2, b2) = forms[m1], forms[m2]
 
-    if s1 is None:  # x op s2 = target
-        if op == '+':
-            return solve(monkeys, m1, target - s2)
-        if op == '-':
-            return solve(monkeys, m1, target + s2)
-        if op == '*':
-            return solve(monkeys, m1, target // s2)
-        if op == '/':
-            return solve(monkeys, m1, target * s2)
-
-    elif s2 is None:  # s1 op x = target
         if op == '+':
-            return solve(monkeys, m2, target - s1)
-        if op == '-':
-            return solve(monkeys, m2, -(target - s1))
-        if op == '*':
-            return solve(monkeys, m2, target // s1)
-        if op == '/':
-            return solve(monkeys, m2, s1 // target)
+            forms[name] = (a1 + a2, b1 + b2)
+        elif op == '-':
+            forms[name] = (a1 - a2, b1 - b2)
+        elif op == '*':
+            if a1 and a2:
+                raise ValueError(f"Monkey {name} is not linear in humn")
+            forms[name] = (a1 * b2 + a2 * b1, b1 * b2)
+        elif op == '/':
+            if a2:
+                raise ValueError(f"Monkey {name} is not linear in humn")
+            forms[name] = (a1 / b2, b1 / b2)
+
+    return forms
+
+
+def solve_linear(forms: dict[str, tuple[Fraction, Fraction]], monkey_name: str, target: int) -> int | None:
+    """
+    Find the number 'humn' must yell for a given monkey to yell the target - a single division, for any monkey/target
+
+    :param forms: Linear forms of each monkey, from linear_forms
+    :param monkey_name: Name of the monkey which must yell target
+    :param target: Number the monkey must yell
+    :return: int | None - Number we ('humn') must yell, None if the monkey does not depend on 'humn'
+    :raises ValueError: If no whole number makes the monkey yell the target
+    """
+    a, b = forms[monkey_name]
+    if not a:
+        return None
+
+    humn = (target - b) / a
+    if humn.denominator != 1:
+        raise ValueError(f"No whole number for humn makes monkey {monkey_name} yell {target} (needs {humn})")
+
+    return int(humn)
 
 
 def main() -> None:
@@ -106,7 +164,8 @@ def main() -> None:
     monkeys['humn'] = None  # This is the number we have to yell, so its provided number is irrelevant
     monkeys['root'][1] = '-'  # Equality check the same as n - m == 0, so req. n = m on both sides of root's op
 
-    part2_sol = solve(monkeys, 'root', 0)
+    forms = linear_forms(monkeys, 'root')
+    part2_sol = solve_linear(forms, 'root', 0)
     print(f"What number do you yell to pass root's equality test?"
           f"\nAnswer: {part2_sol}")
 
@@ -2,221 +2,326 @@
 # Advent of Code 2022 - Day 22
 #######################################################################################################################
 
-def firstcol_fromleft(r):
-	for c in range(WIDTH):
-		if grid[r][c] != ' ':
-			return c
-
-def firstcol_fromright(r):
-	for c in range(WIDTH - 1, -1, -1):
-		if grid[r][c] != ' ':
-			return c
-
-def firstrow_fromtop(c):
-	for r in range(HEIGHT):
-		if grid[r][c] != ' ':
-			return r
-
-def firstrow_frombottom(c):
-	for r in range(HEIGHT - 1, -1, -1):
-		if grid[r][c] != ' ':
-			return r
-
-def face(r, c):
-	assert r != 0 and c != 0 and r != HEIGHT - 1 and c != WIDTH - 1
-
-	if r <= 50:
-		if c <= 50:
-			assert False
-		elif c <= 100:
-			return 1, r, c - 50
-		else:
-			return 2, r, c - 100
-	elif r <= 100:
-		if c <= 50:
-			assert False
-		elif c <= 100:
-			return 3, r - 50, c - 50
-		else:
-			assert False
-	elif r <= 150:
-		if c <= 50:
-			return 4, r - 100, c
-		elif c <= 100:
-			return 5, r - 100, c - 50
-		else:
-			assert False
-	else:
-		if c <= 50:
-			return 6, r - 150, c
-		else:
-			assert False
-
-def wrap(r, c, d):
-	f, fr, fc = face(r, c)
-	assert 1 <= f <= 6
-
-	if f == 1:
-		if d == UP: # -> face 6 going right
-			newf = 6
-			res = fc + 150, 1, RIGHT
-		elif d == LEFT: # -> face 4 going right
-			newf = 4
-			res = (51 - fr) + 100, 1, RIGHT
-		else:
-			assert False, f'bad direction in face {f}: {RDLU[d]} | r: {r} c: {c} fr: {fr} fc: {fc}'
-	elif f == 2:
-		if d == UP: # -> face 6 up
-			newf = 6
-			res = 200, fc, UP
-		elif d == DOWN: # -> face 3 left
-			newf = 3
-			res = fc + 50, 100, LEFT
-		elif d == RIGHT: # -> face 5 left
-			newf = 5
-			res = (51 - fr) + 100, 100, LEFT
-		else:
-			assert False, f'bad direction in face {f}: {RDLU[d]} | r: {r} c: {c} fr: {fr} fc: {fc}'
-	elif f == 3:
-		if d == LEFT: # -> face 4 down
-			newf = 4
-			res = 101, fr, DOWN
-		elif d == RIGHT: # -> face 2 up
-			newf = 2
-			res = 50, fr + 100, UP
-		else:
-			assert False, f'bad direction in face {f}: {RDLU[d]} | r: {r} c: {c} fr: {fr} fc: {fc}'
-	elif f == 4:
-		if d == UP: # -> face 3 right
-			newf = 3
-			res = fc + 50, 51, RIGHT
-		elif d == LEFT: # -> face 1 right
-			newf = 1
-			res = (51 - fr), 51, RIGHT
-		else:
-			assert False, f'bad direction in face {f}: {RDLU[d]} | r: {r} c: {c} fr: {fr} fc: {fc}'
-	elif f == 5:
-		if d == RIGHT: # -> face 2 left
-			newf = 2
-			res = (51 - fr), 150, LEFT
-		elif d == DOWN: # -> face 6 left
-			newf = 6
-			res = fc + 150, 50, LEFT
-		else:
-			assert False, f'bad direction in face {f}: {RDLU[d]} | r: {r} c: {c} fr: {fr} fc: {fc}'
-	else:
-		if d == LEFT: # -> face 1 down
-			newf = 1
-			res = 1, fr + 50, DOWN
-		elif d == RIGHT: # -> face 5 up
-			newf = 5
-			res = 150, fr + 50, UP
-		elif d == DOWN: # -> face 2 down
-			newf = 2
-			res = 1, fc + 100, DOWN
-		else:
-			assert False, f'bad direction in face {f}: {RDLU[d]} | r: {r} c: {c} fr: {fr} fc: {fc}'
-
-	f, fr, fc = face(res[0], res[1])
-	assert f == newf, 'New face seems wrong!'
-	return res
-
-
-grid = []
-
-input_file = open('day22-input.txt')
-for line in input_file:
-    line = line.rstrip('\n')
-    if not line:
-        break
-
-    grid.append(line)
-
-
-WIDTH = max(map(len, grid))
-HEIGHT = len(grid)
-
-for i in range(len(grid)):
-	grid[i] = list(' ' + grid[i].ljust(WIDTH, ' ') + ' ')
-
-WIDTH += 2
-HEIGHT += 2
-grid = [list(' ' * WIDTH)] + grid + [list(' ' * WIDTH)]
-
-moves = input_file.readline().strip()
-moves = moves.replace('R', ' R ').replace('L', ' L ').split()
-R, C = 1, grid[1].index('.')
-direction = 0
+from __future__ import annotations
+from array import array
+from bisect import bisect_left, bisect_right
+from math import isqrt
+from typing import Protocol
+import re
 
 RIGHT, DOWN, LEFT, UP = range(4)
 DIRMAP = [
-	(0, 1),
-	(1, 0),
-	(0, -1),
-	(-1, 0),
+    (0, 1),
+    (1, 0),
+    (0, -1),
+    (-1, 0),
 ]
 
-CURSOR = '>v<^'
-RDLU = 'RDLU'
-
-for i, move in enumerate(moves):
-	if i % 2 == 0:
-		n = int(move)
-		dr, dc = DIRMAP[direction]
-
-		for _ in range(n):
-			newr = R + dr
-			newc = C + dc
-
-			if grid[newr][newc] == ' ':
-				if direction == RIGHT:
-					newc = firstcol_fromleft(newr)
-				elif direction == LEFT:
-					newc = firstcol_fromright(newr)
-				elif direction == DOWN:
-					newr = firstrow_fromtop(newc)
-				elif direction == UP:
-					newr = firstrow_frombottom(newc)
-
-			if grid[newr][newc] == '#':
-				break
-
-			R, C = newr, newc
-	else:
-		if move == 'R':
-			direction = (direction + 1) % 4
-		else:
-			direction = (direction - 1) % 4
-
-ans = 1000 * R + 4 * C + direction
-print(f"Part 1: {ans}")
-
-
-R, C = 1, grid[1].index('.')
-direction = 0
-
-for i, move in enumerate(moves):
-	if i % 2 == 0:
-		n = int(move)
-
-		for _ in range(n):
-			dr, dc = DIRMAP[direction]
-			newr = R + dr
-			newc = C + dc
-			newd = direction
-
-			if grid[newr][newc] == ' ':
-				newr, newc, newd = wrap(R, C, direction)
-
-			if grid[newr][newc] == '#':
-				break
-
-			R, C, direction = newr, newc, newd
-	else:
-		if move == 'R':
-			direction = (direction + 1) % 4
-		else:
-			direction = (direction - 1) % 4
-
-ans2 = 1000 * R + 4 * C + direction
-print(f"Part 2: {ans2}")
+BLANK, OPEN, WALL = ord(' '), ord('.'), ord('#')
+TURN_RIGHT, TURN_LEFT = -1, -2  # Move tokens for turns - every other token is a (non-negative) number of steps
+
+
+class Board:
+    """
+    Board of open tiles and walls, padded with a border of blank cells so that stepping off the board never leaves
+    the grid. Cells are stored in a compact bytearray, indexed by row * width + col.
+    """
+
+    def __init__(self, rows: list[str]) -> None:
+        """
+        Create a Board from the rows of the board in the input (which may be ragged)
+
+        :param rows: Rows of the board, as given in the input
+        """
+        self.width = max(map(len, rows)) + 2
+        self.height = len(rows) + 2
+
+        self.cells = bytearray(b' ' * self.width)
+        for row in rows:
+            self.cells += (' ' + row).ljust(self.width).encode()
+        self.cells += b' ' * self.width
+
+    def cell(self, r: int, c: int) -> int:
+        """
+        Get the cell at a (padded) row and column
+
+        :param r: Row
+        :param c: Column
+        :return: int - BLANK, OPEN, or WALL
+        """
+        return self.cells[r * self.width + c]
+
+    def start(self) -> tuple[int, int]:
+        """
+        Get the starting position: the leftmost open tile of the top row of tiles
+
+        :return: tuple[int, int] - Row and column of the start
+        """
+        return 1, self.cells.index(OPEN, self.width) - self.width
+
+    def rows(self) -> list[bytes]:
+        """
+        Get every (padded) row of the Board
+
+        :return: list[bytes] - Rows of cells
+        """
+        return [bytes(self.cells[r * self.width:(r + 1) * self.width]) for r in range(self.height)]
+
+    def columns(self) -> list[bytes]:
+        """
+        Get every (padded) column of the Board
+
+        :return: list[bytes] - Columns of cells
+        """
+        return [bytes(self.cells[c::self.width]) for c in range(self.width)]
+
+
+class WrapStrategy(Protocol):
+    """
+    How to move along the Board, including what happens when stepping off the edge of the map
+    """
+
+    def move(self, r: int, c: int, d: int, n: int) -> tuple[int, int, int]:
+        """
+        Move up to n steps from (r, c) facing d, stopping early at a wall
+
+        :return: tuple[int, int, int] - New row, column, and facing
+        """
+
+
+class FlatWrap:
+    """
+    Part 1 wrapping: stepping off the map wraps around to the other end of the same row or column
+
+    For each row and column, the first and last non-blank cells, and the sorted positions of the walls between them,
+    are found once. Each line's non-blank cells are contiguous, so a whole n-step move is then resolved with a binary
+    search for the next wall, instead of stepping one cell at a time.
+    """
+
+    def __init__(self, board: Board) -> None:
+        self.row_spans, self.row_walls = self._line_tables(board.rows())
+        self.col_spans, self.col_walls = self._line_tables(board.columns())
+
+    @staticmethod
+    def _line_tables(lines: list[bytes]) -> tuple[list[tuple[int, int] | None], list[list[int]]]:
+        """
+        For each line (row or column), find the first and last non-blank cells, and the positions of its walls
+
+        :param lines: Rows or columns of the Board
+        :return: tuple - Span of non-blank cells (None if all blank), and sorted wall positions, for each line
+        """
+        spans, walls = [], []
+
+        for line in lines:
+            cells = [i for i, cell in enumerate(line) if cell != BLANK]
+            spans.append((cells[0], cells[-1]) if cells else None)
+            walls.append([i for i in cells if line[i] == WALL])
+
+        return spans, walls
+
+    def move(self, r: int, c: int, d: int, n: int) -> tuple[int, int, int]:
+        """
+        Move up to n steps from (r, c) facing d, wrapping around the row or column, and stopping just before the
+        next wall
+
+        :return: tuple[int, int, int] - New row, column, and facing (unchanged)
+        """
+        if d in (RIGHT, LEFT):
+            (first, last), walls, pos = self.row_spans[r], self.row_walls[r], c
+        else:
+            (first, last), walls, pos = self.col_spans[c], self.col_walls[c], r
+
+        length = last - first + 1
+        step = 1 if d in (RIGHT, DOWN) else -1
+
+        if walls:
+            if step == 1:
+                i = bisect_right(walls, pos)
+                next_wall = walls[i] if i < len(walls) else walls[0] + length  # Next wall is after wrapping around
+                n = min(n, next_wall - pos - 1)
+            else:
+                i = bisect_left(walls, pos) - 1
+                next_wall = walls[i] if i >= 0 else walls[-1] - length  # Next wall is after wrapping around
+                n = min(n, pos - next_wall - 1)
+
+        pos = first + (pos - first + step * n) % length
+        return (r, pos, d) if d in (RIGHT, LEFT) else (pos, c, d)
+
+
+def neg(v: tuple[int, int, int]) -> tuple[int, int, int]:
+    """
+    Negate a 3D vector
+    """
+    return -v[0], -v[1], -v[2]
+
+
+def fold_cube(board: Board) -> dict[tuple[int, int, int], tuple[int, int, int]]:
+    """
+    Fold the net on the Board into a cube, and stitch its edges together
+
+    The face size is found from the number of non-blank cells, and each face-sized block of the Board is a face of the
+    net. Walking the net from the first face, each face is given a 3D orientation: its outward normal, and the 3D
+    directions of increasing column (right) and increasing row (down). Stepping off a face in 3D direction v lands on
+    the face whose normal is v, now travelling in the direction of the old face's negated normal.
+
+    :param board: Board holding the cube net
+    :return: dict - Transition table (row, col, dir) -> (row, col, dir), for every step that leaves the net
+    """
+    size = isqrt(sum(cell != BLANK for cell in board.cells) // 6)
+
+    # Net blocks (block row, block col) that hold a face - the Board is padded by one cell on every side
+    blocks = {((r - 1) // size, (c - 1) // size)
+              for r in range(1, board.height - 1, size)
+              for c in range(1, board.width - 1, size)
+              if board.cell(r, c) != BLANK}
+
+    # Orientation of each face as (normal, right, down) 3D vectors
+    first = min(blocks)
+    frames = {first: ((0, 0, -1), (1, 0, 0), (0, 1, 0))}
+    to_visit = [first]
+    while to_visit:
+        block = to_visit.pop()
+        normal, right, down = frames[block]
+        br, bc = block
+        for neighbour, frame in (
+            ((br, bc + 1), (right, neg(normal), down)),
+            ((br + 1, bc), (down, right, neg(normal))),
+            ((br, bc - 1), (neg(right), normal, down)),
+            ((br - 1, bc), (neg(down), right, normal)),
+        ):
+            if neighbour in blocks and neighbour not in frames:
+                frames[neighbour] = frame
+                to_visit.append(neighbour)
+
+    by_normal = {frame[0]: block for block, frame in frames.items()}
+
+    def direction_vector(frame, d):
+        _, right, down = frame
+        return (right, down, neg(right), neg(down))[d]
+
+    edges = {}
+    for block, frame in frames.items():
+        br, bc = block
+        for d in range(4):
+            new_block = by_normal[direction_vector(frame, d)]
+            new_frame = frames[new_block]
+            new_d = next(nd for nd in range(4) if direction_vector(new_frame, nd) == neg(frame[0]))
+
+            # Axis along the edge (3D) on each face, which the position along the edge is measured on
+            along = frame[2] if d in (RIGHT, LEFT) else frame[1]
+            new_along = new_frame[2] if new_d in (RIGHT, LEFT) else new_frame[1]
+
+            for t in range(size):
+                fr, fc = {RIGHT: (t, size - 1), DOWN: (size - 1, t), LEFT: (t, 0), UP: (0, t)}[d]
+                r, c = 1 + br * size + fr, 1 + bc * size + fc
+                dr, dc = DIRMAP[d]
+                if board.cell(r + dr, c + dc) != BLANK:
+                    continue  # Neighbouring face is next to this one in the net - just step onto it
+
+                nt = t if new_along == along else size - 1 - t
+                nfr, nfc = {RIGHT: (nt, 0), DOWN: (0, nt), LEFT: (nt, size - 1), UP: (size - 1, nt)}[new_d]
+                nbr, nbc = new_block
+                edges[r, c, d] = (1 + nbr * size + nfr, 1 + nbc * size + nfc, new_d)
+
+    return edges
+
+
+class CubeWrap:
+    """
+    Part 2 wrapping: the map is a cube net, so stepping off the map continues onto the adjoining face of the cube
+    """
+
+    def __init__(self, board: Board) -> None:
+        self.board = board
+        self.edges = fold_cube(board)
+
+    def move(self, r: int, c: int, d: int, n: int) -> tuple[int, int, int]:
+        """
+        Move up to n steps from (r, c) facing d, following the cube's edges, and stopping just before a wall
+
+        :return: tuple[int, int, int] - New row, column, and facing
+        """
+        cells, width, edges = self.board.cells, self.board.width, self.edges
+
+        for _ in range(n):
+            dr, dc = DIRMAP[d]
+            new_r, new_c, new_d = r + dr, c + dc, d
+
+            if cells[new_r * width + new_c] == BLANK:
+                new_r, new_c, new_d = edges[r, c, d]
+
+            if cells[new_r * width + new_c] == WALL:
+                break
+
+            r, c, d = new_r, new_c, new_d
+
+        return r, c, d
+
+
+def parse_moves(path: str) -> array:
+    """
+    Tokenise the path description into an int array: steps as themselves, and turns as TURN_RIGHT / TURN_LEFT
+
+    :param path: Path description (e.g. "10R5L5")
+    :return: array - Move tokens
+    """
+    return array('i', (TURN_RIGHT if token == 'R' else TURN_LEFT if token == 'L' else int(token)
+                       for token in re.findall(r"\d+|[RL]", path)))
+
+
+def parse_input(data: str) -> tuple[Board, array]:
+    """
+    Parse the input into the Board, and the tokenised moves
+
+    :param data: Input text
+    :return: tuple[Board, array] - Board, and move tokens
+    """
+    board_text, path = data.rstrip('\n').split('\n\n')
+    return Board(board_text.split('\n')), parse_moves(path.strip())
+
+
+def walk(board: Board, moves: array, strategy: WrapStrategy) -> int:
+    """
+    Follow the moves from the start of the Board, using the given wrapping strategy
+
+    :param board: Board to walk
+    :param moves: Move tokens
+    :param strategy: How to move (and wrap) along the Board
+    :return: int - Final password = 1000 * row + 4 * column + facing
+    """
+    r, c = board.start()
+    d = RIGHT
+
+    for move in moves:
+        if move == TURN_RIGHT:
+            d = (d + 1) % 4
+        elif move == TURN_LEFT:
+            d = (d - 1) % 4
+        else:
+            r, c, d = strategy.move(r, c, d, move)
+
+    return 1000 * r + 4 * c + d
+
+
+def main():
+    """
+    The monkeys give us a map of open tiles and walls, and a path of steps and turns to follow from the top-left tile.
+    The password is 1000 * row + 4 * column + facing, where we end up.
+
+    Part 1 Solution:
+    - Stepping off the map wraps around to the other end of the same row or column.
+    - FlatWrap precomputes each row's and column's span and walls, so a whole move is a binary search.
+
+    Part 2 Solution:
+    - The map is a net of a cube, so stepping off the map continues on the adjoining face.
+    - CubeWrap folds the net (of any layout or face size) into a cube, and precomputes every edge transition.
+    """
+    with open('day22-input.txt') as input_file:
+        board, moves = parse_input(input_file.read())
+
+    print(f"Part 1: {walk(board, moves, FlatWrap(board))}")
+    print(f"Part 2: {walk(board, moves, CubeWrap(board))}")
+
+
+if __name__ == "__main__":
+    main()
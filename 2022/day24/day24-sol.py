@@ -3,56 +3,115 @@
 #######################################################################################################################
 
 from __future__ import annotations
-from collections import defaultdict
 from dataclasses import dataclass
+from heapq import heappop, heappush
+from math import lcm
 
 
 @dataclass(frozen=True)
 class Point:
     """
-    Point x,y which knows how to add another point, and how to return all adjacent (non-diag) points
+    Point x,y which holds the start and goal co-ordinates
     """
     x: int
     y: int
 
-    def __add__(self, other: Point) -> Point:
+    def __repr__(self):
         """
-        Add other point to this point, returning new point vector
+        Represent a point via its x and y co-ordinates
+
+        :return: String of x and y co-ordinates
         """
-        return Point(self.x + other.x, self.y + other.y)
+        return f"P({self.x},{self.y})"
 
-    def adjacent_points(self) -> set[Point]:
+
+BLIZZARD_DIRECTIONS = '>v<^'  # Characters marking a blizzard moving right, down, left, or up
+
+
+class BlizzardBitmaps:
+    """
+    Precomputed blizzard occupancy, stored as one integer bitmask per grid row (bit x set = blizzard at column x).
+    Horizontal blizzards repeat with period width, and vertical blizzards repeat with period height, so we only
+    need width horizontal tables and height vertical tables to answer "is (x, y) free at time t" for any t.
+    """
+
+    def __init__(self, direction_rows: dict[str, list[int]], width: int, height: int) -> None:
+        self.direction_rows = direction_rows
+        self.width = width
+        self.height = height
+        self.full_row = (1 << width) - 1
+
+        # Horizontal blizzards stay in their row, so rotate each row's bits by t
+        self.horizontal = [[self.rotate(right, t) | self.rotate(left, -t)
+                            for right, left in zip(direction_rows['>'], direction_rows['<'])]
+                           for t in range(width)]
+
+        # Vertical blizzards stay in their column, so row y at time t holds the row that started t rows away
+        self.vertical = [[direction_rows['v'][(y - t) % height] | direction_rows['^'][(y + t) % height]
+                          for y in range(height)]
+                         for t in range(height)]
+
+    def rotate(self, row: int, shift: int) -> int:
         """
-        Get set of adjacent Points to this Point
+        Rotate a row bitmask towards higher x (wrapping around the grid width) by the given shift
 
-        :return: set[Point] - Set of adjacent Points to this Point
+        :param row: int - Row bitmask
+        :param shift: int - Number of columns to rotate by (negative rotates towards lower x)
+        :return: int - Rotated row bitmask
         """
-        return set(self + vector for vector in VECTORS.values())
+        shift %= self.width
+        return ((row << shift) | (row >> (self.width - shift))) & self.full_row
 
-    def __repr__(self):
+    def row_occupancy(self, y: int, t: int) -> int:
         """
-        Represent a point via its x and y co-ordinates
+        Get bitmask of all blizzards in row y at time t
 
-        :return: String of x and y co-ordinates
+        :param y: int - Row index
+        :param t: int - Time
+        :return: int - Row bitmask of occupied cells
         """
-        return f"P({self.x},{self.y})"
+        return self.horizontal[t % self.width][y] | self.vertical[t % self.height][y]
+
+    def is_free(self, x: int, y: int, t: int) -> bool:
+        """
+        Check whether in-bounds grid cell (x, y) has no blizzard at time t
+
+        :param x: int - Column index
+        :param y: int - Row index
+        :param t: int - Time
+        :return: bool - True if no blizzard occupies the cell, False otherwise
+        """
+        return not ((self.horizontal[t % self.width][y] >> x) & 1 or (self.vertical[t % self.height][y] >> x) & 1)
 
+    def blizzards_at(self, x: int, y: int, t: int) -> list[str]:
+        """
+        Get the list of blizzard directions present at (x, y) at time t
 
-VECTORS = {
-    '>': Point(1, 0),
-    'v': Point(0, 1),
-    '<': Point(-1, 0),
-    '^': Point(0, -1)
-}
+        :param x: int - Column index
+        :param y: int - Row index
+        :param t: int - Time
+        :return: list[str] - Direction characters of the blizzards in the cell (empty if none)
+        """
+        rows = self.direction_rows
+        found = []
+        if (self.rotate(rows['>'][y], t) >> x) & 1:
+            found.append('>')
+        if (rows['v'][(y - t) % self.height] >> x) & 1:
+            found.append('v')
+        if (self.rotate(rows['<'][y], -t) >> x) & 1:
+            found.append('<')
+        if (rows['^'][(y + t) % self.height] >> x) & 1:
+            found.append('^')
+        return found
 
 
 class MapState:
     """
-    Store location of blizzards, grid bounds, start, goal, and time
+    Store precomputed blizzard bitmaps, grid bounds, start, goal, and time
     """
 
-    def __init__(self, blizzards: dict, grid_dims: tuple, start: Point, goal: Point, t: int) -> None:
-        self._blizzards: dict[Point, list] = blizzards
+    def __init__(self, bitmaps: BlizzardBitmaps, grid_dims: tuple, start: Point, goal: Point, t: int) -> None:
+        self._bitmaps = bitmaps
         self._width = grid_dims[0]
         self._height = grid_dims[1]
         self._start = start
@@ -65,20 +124,20 @@ class MapState:
         Create a new MapState using an input grid
         """
         grid: list[str] = grid_input
-        blizzards = defaultdict(list)
-        for y, row in enumerate(grid[1:-1]):  # Ignore top and bottom
-            for x, col in enumerate(row[1:-1]):  # Ignore left and right
-                point = Point(x, y)
-                if col in VECTORS:
-                    blizzards[point].append(col)
-
         height = len(grid) - 2
         width = len(grid[0]) - 2
 
+        direction_rows = {direction: [0] * height for direction in BLIZZARD_DIRECTIONS}
+        for y, row in enumerate(grid[1:-1]):  # Ignore top and bottom
+            for x, col in enumerate(row[1:-1]):  # Ignore left and right
+                if col in BLIZZARD_DIRECTIONS:
+                    direction_rows[col][y] |= 1 << x
+
         start = Point(0, -1)  # 1 above top grid row
         goal = Point(width - 1, height)  # 1 below bottom grid row
 
-        return MapState(blizzards, (width, height), start=start, goal=goal, t=0)
+        bitmaps = BlizzardBitmaps(direction_rows, width, height)
+        return MapState(bitmaps, (width, height), start=start, goal=goal, t=0)
 
     @property
     def start(self) -> Point:
@@ -117,44 +176,49 @@ class MapState:
         self._goal = point
 
     @property
-    def time(self) -> int:
+    def width(self) -> int:
         """
-        Get time
+        Get width of the grid, excluding walls
 
-        :return: int - time
+        :return: int - width
         """
-        return self._time
+        return self._width
 
-    def next_blizzard_state(self) -> MapState:
+    @property
+    def height(self) -> int:
         """
-        Move blizzards to achieve next blizzard state - there is only one possible next blizzard state
+        Get height of the grid, excluding walls
+
+        :return: int - height
         """
-        next_blizzards = defaultdict(list)
-        for loc, blizzards_here in self._blizzards.items():
-            for current_bliz in blizzards_here:
-                next_bliz_x = (loc + VECTORS[current_bliz]).x % self._width
-                next_bliz_y = (loc + VECTORS[current_bliz]).y % self._height
-                next_blizzards[Point(next_bliz_x, next_bliz_y)].append(current_bliz)
+        return self._height
 
-        return MapState(next_blizzards, (self._width, self._height), self._start, self._goal, self.time + 1)
+    @property
+    def bitmaps(self) -> BlizzardBitmaps:
+        """
+        Get the precomputed blizzard bitmaps
 
-    def is_valid(self, point: Point) -> bool:
+        :return: BlizzardBitmaps - bitmaps
         """
-        Check if the specified point is an allowed position in the current blizzard state
+        return self._bitmaps
+
+    @property
+    def time(self) -> int:
         """
-        if point in (self._start, self._goal):  # Out of bounds, but allowed
-            return True
+        Get time
 
-        # Out of bounds
-        if not (0 <= point.x < self._width):
-            return False
-        if not (0 <= point.y < self._height):
-            return False
+        :return: int - time
+        """
+        return self._time
 
-        if point in self._blizzards:
-            return False
+    @time.setter
+    def time(self, t: int):
+        """
+        Set time - the blizzard positions are derived from the precomputed bitmaps, so this is all that changes
 
-        return True
+        :param t: int - time to set
+        """
+        self._time = t
 
     def __str__(self) -> str:
         """
@@ -164,14 +228,12 @@ class MapState:
         for y in range(0, self._height):
             line = ""
             for x in range(0, self._width):
-                loc = Point(x, y)
-                if loc in self._blizzards:
-                    blizzards_here = self._blizzards[loc]
-                    how_many_blizzards = len(blizzards_here)
-                    if how_many_blizzards == 1:  # One blizzard here
-                        line += next(bliz for bliz in blizzards_here)
-                    elif how_many_blizzards > 1:  # More than one blizzard here
-                        line += str(how_many_blizzards)
+                blizzards_here = self._bitmaps.blizzards_at(x, y, self._time)
+                how_many_blizzards = len(blizzards_here)
+                if how_many_blizzards == 1:  # One blizzard here
+                    line += blizzards_here[0]
+                elif how_many_blizzards > 1:  # More than one blizzard here
+                    line += str(how_many_blizzards)
                 else:
                     line += '.'
 
@@ -186,35 +248,102 @@ class MapState:
         return f"Time={self.time}, Hash={hash(self)}"
 
 
-def bfs(state: MapState) -> MapState:
+def bfs(state: MapState, count_visited: bool = False) -> MapState | tuple[MapState, int]:
     """
     BFS, but we're allowed to backtrack - our frontier should only contain the current set of allowed next locations
+
+    The frontier is held as one int bitmask per grid row, so each minute is a handful of big-int operations per row:
+    next row = (row | row shifted left/right | row above | row below) & ~blizzards
+
+    :param state: MapState to search from (its time is advanced to the arrival time at the goal)
+    :param count_visited: If True, also return the number of (cell, minute) states visited - the total number of set
+        bits over every minute's frontier - for comparison with the states expanded by a_star
+    :return: MapState | tuple[MapState, int] - Latest state (at the goal), and the visited count if requested
     """
     start = state.start
     goal = state.goal
+    height = state.height
+    bitmaps = state.bitmaps
+
+    # Start and goal sit outside the grid, so note which grid row (and column bit) touches each of them
+    start_row, start_bit = (0 if start.y < 0 else height - 1), 1 << start.x
+    goal_row, goal_bit = (0 if goal.y < 0 else height - 1), 1 << goal.x
 
-    # Use a set because the many neighbours of the points in our frontier may be the same position
-    # We don't want to explore the same location twice IN THE SAME ITERATION
-    frontier = {start}
+    # We can always wait at the start, so the frontier only tracks locations inside the grid
+    frontier = [0] * height
+    visited = 0
 
-    while goal not in frontier:
-        state = state.next_blizzard_state()
+    while not frontier[goal_row] & goal_bit:
+        state.time += 1  # Blizzards are precomputed, so advancing time needs no new state
         # Reset frontier because we can revisit locations we've been to before
-        frontier = set(explore_frontier(state, frontier))
+        frontier = explore_frontier(bitmaps, frontier, start_row, start_bit, state.time)
+        if count_visited:
+            visited += sum(row.bit_count() for row in frontier)
+
+    state.time += 1  # Step out of the grid onto the goal
+    return (state, visited) if count_visited else state
+
 
-    return state
+def explore_frontier(bitmaps: BlizzardBitmaps, frontier: list[int], start_row: int, start_bit: int,
+                     t: int) -> list[int]:
+    """
+    Return the row bitmasks of all valid locations at time t reachable from the frontier at time t-1
+    """
+    height = len(frontier)
+    next_frontier = []
+    above = 0
+    for y, row in enumerate(frontier):
+        below = frontier[y + 1] if y + 1 < height else 0
+        reachable = row | (row << 1) | (row >> 1) | above | below  # Staying still may be a valid move
+        if y == start_row:
+            reachable |= start_bit
+        next_frontier.append(reachable & bitmaps.full_row & ~bitmaps.row_occupancy(y, t))
+        above = row
 
+    return next_frontier
 
-def explore_frontier(current_state, frontier):
+
+def a_star(state: MapState) -> tuple[MapState, int]:
     """
-    Generator that returns all valid next locations with current blizzard state from all locations in the frontier
+    Alternative engine to bfs: A* over (x, y, t mod lcm(width, height)), using Manhattan distance to the goal.
+    The blizzard state repeats every lcm(width, height) minutes, so the closed set is keyed on the cyclic time.
+
+    :return: tuple[MapState, int] - Latest state (at the goal), and number of states expanded to get there
     """
-    for loc in frontier:
-        for neighbour in loc.adjacent_points():
-            if current_state.is_valid(neighbour):
-                yield neighbour
-        if current_state.is_valid(loc):  # Staying still may be a valid move
-            yield loc
+    start = state.start
+    goal = state.goal
+    width, height = state.width, state.height
+    bitmaps = state.bitmaps
+    period = lcm(width, height)
+
+    def heuristic(x: int, y: int) -> int:
+        return abs(goal.x - x) + abs(goal.y - y)
+
+    frontier = [(state.time + heuristic(start.x, start.y), state.time, start.x, start.y)]
+    closed = set()
+    expanded = 0
+
+    while frontier:
+        _, t, x, y = heappop(frontier)
+        if (x, y) == (goal.x, goal.y):
+            state.time = t
+            return state, expanded
+
+        key = (x, y, t % period)
+        if key in closed:
+            continue
+        closed.add(key)
+        expanded += 1
+
+        for dx, dy in ((0, 0), (1, 0), (0, 1), (-1, 0), (0, -1)):  # Staying still may be a valid move
+            nx, ny = x + dx, y + dy
+            if (nx, ny) not in ((start.x, start.y), (goal.x, goal.y)):
+                if not (0 <= nx < width and 0 <= ny < height) or not bitmaps.is_free(nx, ny, t + 1):
+                    continue
+            if (nx, ny, (t + 1) % period) not in closed:
+                heappush(frontier, (t + 1 + heuristic(nx, ny), t + 1, nx, ny))
+
+    raise ValueError("Goal is unreachable")
 
 
 def main():
@@ -226,27 +355,32 @@ def main():
     Part 1 Solution:
     What is the fewest number of minutes required to avoid the blizzards and reach the goal?
 
-    - VECTORS dict to represent one unit movement in any of the four directions.
-    - Point class to store current location, and which allows us to add vectors to return four adjacent Points.
+    - BLIZZARD_DIRECTIONS string of the four blizzard characters.
+    - Point class to store the start and goal locations.
     - Create a MapState:
       - Create a factory method that initialises a MapState from the input grid.
       - Defines the grid bounds, but trims out the four edges.
       - Stores the current time.
-      - Stores all current blizzard locations as a dict:
-        Key is location, and value is a list of blizzards, since we can have more than one blizzard at a loc.
+      - Stores blizzard locations as BlizzardBitmaps, built once from the grid:
+        One int bitmask per row per direction. Horizontal blizzards repeat every width minutes, and vertical
+        blizzards repeat every height minutes, so we precompute the occupancy of every row for every time mod
+        width and mod height. Checking a cell at time t is then two bit tests, with no per-minute allocation.
       - Stores start and goal points, and provides getter / setters for them.
-      - Provide a method to generate t+1 MapState, where all blizzards have moved to their new locations.
-      - Provide a method to check if a given point is 'allowed', i.e. within bounds,
-        and not meeting a blizzard. (And add in the start and goal locations.)
+      - Advancing to t+1 is just incrementing the time, since the bitmaps already know where the blizzards are.
     - Implement a BFS that:
-      - Add the start location to the frontier. Make the frontier a set to eliminate duplicate locations.
+      - Holds the frontier as one int bitmask per grid row, which eliminates duplicate locations for free.
+        We can always wait at the start, so it is treated as permanently in the frontier.
       - Then...
-        - Get next MapState.
+        - Advance the MapState time by one minute.
         - Finds all valid next locations for locations in the frontier. This includes checking current location.
+          For each row: (row | row << 1 | row >> 1 | row above | row below) & ~blizzards in that row.
           These locations become a new frontier.
-        - Rinse and repeat until we identify a location that is the goal.
-          Then return the latest state.
+        - Rinse and repeat until the cell next to the goal is in the frontier.
+          Then step onto the goal and return the latest state.
     - Get the time from the latest state.
+    - Alternatively, a_star searches (x, y, t mod lcm(width, height)) with a Manhattan heuristic.
+      It gives the same answer, and reports how many states it expanded, for comparison with the (cell, minute)
+      states the BFS engine visits, as reported by bfs(state, count_visited=True).
 
     Part 2 Solution:
     Now complete a return journey to the start, and then back to the finish. Whas it the total time?
@@ -2,10 +2,15 @@
 # Advent of Code 2022 - Day 7
 #######################################################################################################################
 
+from bisect import bisect_left
+
+
 class DTree:
     """
     Directory Tree: class where a member is a directory containing files and possibly other directories (also DTrees)
+    Each dir keeps its total size up to date as files are added, so size queries are O(1) at any point
     """
+    __slots__ = ("name", "children", "files", "parent", "root", "_size", "_size_index")
 
     def __init__(self, name, parent=None):
         """
@@ -18,15 +23,27 @@ class DTree:
         self.children = {}
         self.files = {}
         self.parent = parent
+        self.root = self if parent is None else parent.root  # Cached, rather than following parents every time
+        self._size = 0  # Total size of all files in this dir and below, kept up to date incrementally
+        self._size_index = None  # Cached sorted sizes of all dirs below this one
 
     def touch(self, size, name):
         """
         Add new file to current dir with given name and size
+        The change in size is propagated up through every parent dir (a file listed again adds no size)
 
         :param size: Size of file
         :param name: Name of file
         """
-        self.files[name] = int(size)
+        size = int(size)
+        delta = size - self.files.get(name, 0)
+        self.files[name] = size
+
+        curr_dir = self
+        while curr_dir is not None:
+            curr_dir._size += delta
+            curr_dir._size_index = None
+            curr_dir = curr_dir.parent
 
     def mkdir(self, name):
         """
@@ -35,16 +52,15 @@ class DTree:
         :param name: Name of new dir
         :return: DTree - The new directory member
         """
-        return self.children.setdefault(name, DTree(name, parent=self))
+        if name not in self.children:
+            self.children[name] = DTree(name, parent=self)
 
-    @property
-    def root(self):
-        """
-        Get the root of the DTree by following parents to top level (i.e., root)
+            curr_dir = self
+            while curr_dir is not None:  # Every dir above now has another (empty) dir in its size index
+                curr_dir._size_index = None
+                curr_dir = curr_dir.parent
 
-        :return: DTree - Root dir
-        """
-        return self if self.parent is None else self.parent.root
+        return self.children[name]
 
     @property
     def size(self):
@@ -53,7 +69,28 @@ class DTree:
 
         :return: Size of this dir, as defined
         """
-        return sum(self.files.values()) + sum(c.size for c in self.children.values())
+        return self._size
+
+    def size_index(self):
+        """
+        Get the sizes of all dirs below this one (as iterated over), sorted, so they can be binary searched
+
+        :return: list[int] - Sorted dir sizes
+        """
+        if self._size_index is None:
+            self._size_index = sorted(curr_dir.size for curr_dir in self)
+        return self._size_index
+
+    def smallest_dir_size_at_least(self, min_size):
+        """
+        Get the size of the smallest dir below this one, with a size of at least min_size
+
+        :param min_size: Minimum dir size
+        :return: int | None - Size of the smallest such dir, or None if there is no such dir
+        """
+        sizes = self.size_index()
+        i = bisect_left(sizes, min_size)
+        return sizes[i] if i < len(sizes) else None
 
     def __iter__(self):
         """
@@ -66,23 +103,56 @@ class DTree:
             yield from child
 
 
-def main():
-    data = open("day7-input.txt").read().strip().split("\n")  # Read input data as array of lines/instructions
+class TerminalLog:
+    """
+    Streaming ingestor for a terminal log of '$ cd' / '$ ls' commands and their output, building a DTree as it goes
+    Lines are ingested one at a time, so dir sizes can be queried at any point in the stream
+    """
+
+    def __init__(self):
+        """
+        Initialise directory tree, with the current dir as root, '/'
+        """
+        self.root = DTree("/")
+        self.cwd = self.root
+
+    def ingest(self, line):
+        """
+        Ingest one line of the terminal log
 
-    cwd = DTree("/")  # Initialise directory tree by moving into root, '/'
-    for line in data[1:]:
-        if line.startswith("dir") or line.startswith("$ ls"):
-            continue  # Can ignore - dirs are picked up by cd targets and no need to print cwd with ls
+        :param line: Line of the log (command, or output of ls)
+        """
+        if not line or line.startswith("dir") or line.startswith("$ ls"):
+            return  # Can ignore - dirs are picked up by cd targets and no need to print cwd with ls
         elif line.startswith("$ cd"):
             target = line[5:]  # Rest of line after '$ cd', i.e., what to cd into
-            cwd = cwd.parent if target == ".." else cwd.mkdir(target)  # Navigate to parent or implicit dir creation
+            if target == "/":
+                self.cwd = self.root
+            else:
+                self.cwd = self.cwd.parent if target == ".." else self.cwd.mkdir(target)  # Implicit dir creation
         else:  # Adding file of given file size
             size, name = line.split()
-            cwd.touch(size, name)
+            self.cwd.touch(size, name)
+
+    def ingest_all(self, lines):
+        """
+        Ingest every line from an iterable of lines (e.g., an open file), without reading them all in first
+
+        :param lines: Iterable of lines of the log
+        :return: DTree - Root of the directory tree
+        """
+        for line in lines:
+            self.ingest(line.rstrip("\n"))
+        return self.root
+
+
+def main():
+    with open("day7-input.txt") as input_file:
+        root = TerminalLog().ingest_all(input_file)  # Stream the log in, line by line
 
     # Part 1:
     # Note that this sum will re-count file sizes as child dirs are traversed - this is expected in the question!
-    part1_sol = sum(curr_dir.size for curr_dir in cwd.root if curr_dir.size < 100000)
+    part1_sol = sum(size for size in root.size_index() if size < 100000)
     print(f"Find all of the directories with a total size of at most 100000."
           f"\nWhat is the sum of the total sizes of those directories?"
           f"\nAnswer: {part1_sol}")  # part 1
@@ -91,7 +161,7 @@ def main():
     file_system_size = 70000000
     update_size = 30000000
     max_usage = file_system_size - update_size
-    part2_sol = min(curr_dir.size for curr_dir in cwd.root if cwd.root.size - curr_dir.size < max_usage)
+    part2_sol = root.smallest_dir_size_at_least(root.size - max_usage + 1)  # Must leave usage < max_usage
     print(f"Find the smallest directory that, if deleted, would free up enough space on the filesystem to run the update."
           f"\nWhat is the total size of that directory?"
           f"\nAnswer: {part2_sol}")
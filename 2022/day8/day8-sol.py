@@ -2,6 +2,11 @@
 # Advent of Code 2022 - Day 8
 #######################################################################################################################
 
+from collections.abc import Callable
+
+import numpy as np
+
+
 def parse(input_str: str) -> tuple[int, int, dict]:
     """
     Parsing the grid of trees from the input string as a dictionary where co-ordinates (x, y) gives the corresponding
@@ -111,13 +116,159 @@ def part_two(width: int, height: int, grid: dict) -> int:
     return max(scenic_score(i, j, width, height, grid) for (i, j) in grid)
 
 
+def parse_flat(input_str: str) -> tuple[int, int, list[int]]:
+    """
+    Parse the grid of trees from the input string as a flat, row-major list of tree heights
+
+    :param input_str: String representing the grid of trees
+    :return: tuple[int, int, list[int]] - number of rows, number of columns, and the flat list of heights
+    """
+    lines = input_str.split()
+    return len(lines), len(lines[0]), [int(height) for line in lines for height in line]
+
+
+def sweep_line(heights: list[int], line: range, visible: bytearray, scores: list[int]) -> None:
+    """
+    Sweep along one line of trees (a row or column, in one direction), looking back towards the edge it started from:
+    - A tree is visible from that edge if it is taller than the running maximum of the trees before it
+    - Its viewing distance towards that edge is found with a monotonic stack of the trees not yet blocked from view
+
+    :param heights: Flat list of tree heights
+    :param line: Flat indices of the trees along the line, in sweep order
+    :param visible: Visibility flags, set for trees visible from this edge
+    :param scores: Scenic scores, multiplied by the viewing distance towards this edge
+    """
+    line_heights = [heights[index] for index in line]
+
+    tallest = -1
+    for index, tree_height in zip(line, line_heights):
+        if tree_height > tallest:
+            visible[index] = 1
+            tallest = tree_height
+            if tallest == 9:
+                break  # Nothing after the tallest possible tree can be seen from this edge
+
+    stack_positions, stack_heights = [], []  # Candidate blockers, with non-increasing heights (equal heights block too)
+    for position, (index, tree_height) in enumerate(zip(line, line_heights)):
+        while stack_heights and stack_heights[-1] < tree_height:  # Shorter trees can never block later trees' view
+            stack_heights.pop()
+            stack_positions.pop()
+        scores[index] *= position - stack_positions[-1] if stack_positions else position  # Blocked, or to the edge
+        stack_positions.append(position)
+        stack_heights.append(tree_height)
+
+
+def analyse_forest(rows: int, cols: int, heights: list[int]) -> tuple[int, int]:
+    """
+    Solve both parts in O(rows * cols), by sweeping every row and column in both directions
+
+    :param rows: Number of rows in the grid
+    :param cols: Number of columns in the grid
+    :param heights: Flat, row-major list of tree heights
+    :return: tuple[int, int] - Number of visible trees, and the max scenic score
+    """
+    size = rows * cols
+    visible = bytearray(size)
+    scores = [1] * size  # Multiplicative identity
+
+    for r in range(rows):
+        row = range(r * cols, (r + 1) * cols)
+        sweep_line(heights, row, visible, scores)  # Looking left/West
+        sweep_line(heights, row[::-1], visible, scores)  # Looking right/East
+
+    for c in range(cols):
+        col = range(c, size, cols)
+        sweep_line(heights, col, visible, scores)  # Looking up/North
+        sweep_line(heights, col[::-1], visible, scores)  # Looking down/South
+
+    return sum(visible), max(scores)
+
+
+def load_forest(data: bytes) -> np.ndarray:
+    """
+    Load the grid of trees straight from the input bytes into a 2D NumPy array of heights
+
+    :param data: Bytes of the input (rows of digits, each ending in a newline)
+    :return: np.ndarray - (rows, cols) array of tree heights
+    """
+    data = data.replace(b"\r", b"").strip() + b"\n"  # Tolerate CRLF line endings
+    cols = data.index(b"\n")
+    grid = np.frombuffer(data, dtype=np.uint8).reshape(-1, cols + 1)[:, :cols]  # Drop the newline column
+    return (grid - ord("0")).astype(np.int8)
+
+
+def _orientations(forests: np.ndarray) -> list[tuple[np.ndarray, Callable[[np.ndarray], np.ndarray]]]:
+    """
+    Views of the forests so each of the four directions is looking back along the last axis, towards index 0,
+    with a function to map a result from that view back to the original orientation
+
+    :param forests: (..., rows, cols) array of tree heights
+    :return: list[tuple[np.ndarray, Callable]] - (view, map back) for West, East, North, and South edges
+    """
+    transposed = np.swapaxes(forests, -1, -2)
+    return [
+        (forests, lambda result: result),
+        (forests[..., ::-1], lambda result: result[..., ::-1]),
+        (transposed, lambda result: np.swapaxes(result, -1, -2)),
+        (transposed[..., ::-1], lambda result: np.swapaxes(result[..., ::-1], -1, -2)),
+    ]
+
+
+def _visible_from_start(forests: np.ndarray) -> np.ndarray:
+    """
+    Trees taller than every tree before them along the last axis, using the cumulative maximum
+
+    :param forests: (..., n) array of tree heights
+    :return: np.ndarray - Boolean array of trees visible from index 0
+    """
+    tallest_before = np.full(forests.shape, -1, dtype=forests.dtype)
+    tallest_before[..., 1:] = np.maximum.accumulate(forests, axis=-1)[..., :-1]
+    return forests > tallest_before
+
+
+def _distance_to_start(forests: np.ndarray) -> np.ndarray:
+    """
+    Viewing distance from each tree back towards index 0 along the last axis, computed per height level:
+    for trees of height h, the view is blocked by the last tree before them which is at least h tall
+
+    :param forests: (..., n) array of tree heights
+    :return: np.ndarray - Viewing distances
+    """
+    positions = np.arange(forests.shape[-1], dtype=np.int32)
+    distances = np.zeros(forests.shape, dtype=np.int32)
+    last_blocker = np.zeros(forests.shape, dtype=np.int32)  # Edge (position 0) if no blocker
+
+    for tree_height in range(10):
+        blockers = np.where(forests >= tree_height, positions, 0)
+        np.maximum.accumulate(blockers[..., :-1], axis=-1, out=last_blocker[..., 1:])
+        np.copyto(distances, positions - last_blocker, where=forests == tree_height)
+
+    return distances
+
+
+def analyse_forests(forests: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Batch mode: solve both parts for many same-sized forests at once with vectorised NumPy operations
+
+    :param forests: (num_forests, rows, cols) array of tree heights
+    :return: tuple[np.ndarray, np.ndarray] - Number of visible trees, and max scenic score, for each forest
+    """
+    visible = np.zeros(forests.shape, dtype=bool)
+    scores = np.ones(forests.shape, dtype=np.int64)  # Multiplicative identity
+
+    for view, map_back in _orientations(forests):
+        visible |= map_back(_visible_from_start(view))
+        scores *= map_back(_distance_to_start(view))
+
+    return visible.sum(axis=(-2, -1)), scores.max(axis=(-2, -1))
+
+
 if __name__ == "__main__":
-    grid_width, grid_height, grid_dict = parse(open("day8-input.txt").read().strip())
+    num_rows, num_cols, heights = parse_flat(open("day8-input.txt").read().strip())
+    part1_sol, part2_sol = analyse_forest(num_rows, num_cols, heights)  # Same as part_one and part_two, but O(n^2)
 
-    part1_sol = part_one(grid_width, grid_height, grid_dict)
     print(f"Consider your map; how many trees are visible from outside the grid?"
           f"\nAnswer: {part1_sol}")
 
-    part2_sol = part_two(grid_width, grid_height, grid_dict)
     print(f"Consider each tree on your map. What is the highest scenic score possible for any tree?"
           f"\nAnswer: {part2_sol}")
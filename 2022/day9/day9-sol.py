@@ -3,126 +3,113 @@
 #######################################################################################################################
 from typing import List
 
+DIRECTION_MAP = {'U': (0, 1), 'D': (0, -1), 'R': (1, 0), 'L': (-1, 0)}
 
-def get_directions() -> List[tuple[str, int]]:
+
+def get_directions(file_name: str = "day9-input.txt") -> List[tuple[str, int]]:
     """
     Read the set of directions for the rope head to follow from file
     These directions are given in the format: '<U|D|L|R> <num_steps>'
         , where <U|D|L|R> is the direction of movement (e.g., 'R' = right)
         , and <num_steps> is the number of steps made in said direction
 
+    :param file_name: Input file to read the directions from
     :return: List[tuple[str, int]] - Directions as list of tuples with direction and num steps - e.g., '('U', 2)'
     """
-    lines = open("day9-input.txt", 'r').read().splitlines()
-    directions = [(line.split()[0], int(line.split()[1])) for line in lines]
-    return directions
+    with open(file_name, 'r') as input_file:
+        lines = input_file.read().splitlines()
+    return [(direction, int(num_steps)) for direction, num_steps in map(str.split, lines)]
 
 
-def sign(x: int) -> int:
+def parse_moves(directions: List[tuple[str, int]]) -> List[tuple[int, int, int]]:
     """
-    Utility function to get the sign of a number
+    Convert the directions into head moves, so the direction letters are only looked up once
 
-    :param x: Number to get sign for
-    :return: Sign of the number, with 1 being positive, and -1 being negative
+    :param directions: Directions as list of tuples with direction and num steps - e.g., '('U', 2)'
+    :return: List[tuple[int, int, int]] - Moves as (dx, dy, num_steps) - e.g., '(0, 1, 2)'
     """
-    return 1 if x >= 0 else -1
+    return [(*DIRECTION_MAP[direction], num_steps) for direction, num_steps in directions]
 
 
-def is_adjacent(pos1: tuple[int, int], pos2: tuple[int, int]) -> bool:
+def simulate_rope(moves: List[tuple[int, int, int]], num_knots: int, tracked_knots: tuple[int, ...]) -> List[int]:
     """
-    Calculate whether two positions are adjacent in 2D space
-    The positions can be horizontally, vertically, or diagonally adjacent and must be separated by exactly 1 space
+    Moves the head of a rope with num_knots knots, counting the positions visited by each of the tracked knots
 
-    :param pos1: First position to check adjacency of
-    :param pos2: Second position to check adjacency of
-    :return: bool - True if positions considered adjacent, False otherwise
-    """
-    if abs(pos1[0] - pos2[0]) == 1 and pos1[1] == pos2[1]:  # Horizontally adjacent
-        return True
-    elif pos1[0] == pos2[0] and abs(pos1[0] - pos2[0]) == 1:  # Vertically adjacent
-        return True
-    elif abs(pos1[0] - pos2[0]) == 1 and abs(pos1[1] - pos2[1]) == 1:  # Diagonally adjacent
-        return True
-    else:  # Not adjacent
-        return False
+    The knot positions are held in two flat int lists (xs and ys), with knot 0 considered as the head. Each knot
+    follows the one before it with the sign-clamped (dx, dy) rule, and as soon as a knot does not move, none of the
+    knots after it can move either, so propagation stops there. Positions are recorded as packed ints.
 
+    A knot's path only depends on the knots in front of it, so knot k traces the same path as the tail of a rope with
+    k + 1 knots. Tracking several knots of one long rope therefore answers several rope lengths in one pass.
 
-def update_rope_knot_pos(head_pos: tuple[int, int], tail_pos: tuple[int, int]) -> None:
+    :param moves: Head moves as (dx, dy, num_steps)
+    :param num_knots: Number of knots in the rope
+    :param tracked_knots: Knots (1..num_knots-1) to count the visited positions of
+    :return: List[int] - Number of positions visited at least once by each tracked knot, in the order given
     """
-    Updates the position of the tail (i.e., trailing knot) which directly follows head (i.e., leading knot)
+    xs = [0] * num_knots
+    ys = [0] * num_knots
+    visited = [{0} if knot in tracked_knots else None for knot in range(num_knots)]
 
-    :param head_pos: Current position of the head knot
-    :param tail_pos: Current position of the tail knot
-    """
-    # Guard Condition: Head and tail are at same position or are adjacent, so do nothing
-    if head_pos == tail_pos or is_adjacent(head_pos, tail_pos):
-        return
+    for dx, dy, num_steps in moves:
+        for _ in range(num_steps):
+            xs[0] += dx
+            ys[0] += dy
 
-    head_x, head_y = head_pos
-    tail_x, tail_y = tail_pos
+            # Move all knots following the head, until one stays put
+            for knot in range(1, num_knots):
+                diff_x = xs[knot - 1] - xs[knot]
+                diff_y = ys[knot - 1] - ys[knot]
+                if -1 <= diff_x <= 1 and -1 <= diff_y <= 1:
+                    break
 
-    if abs(head_x - tail_x) == 2 and head_y == tail_y:  # Move tail horizontally
-        tail_pos[0], tail_pos[1] = tail_x + sign(head_x - tail_x), tail_y
+                x = xs[knot] = xs[knot] + (diff_x > 0) - (diff_x < 0)
+                y = ys[knot] = ys[knot] + (diff_y > 0) - (diff_y < 0)
 
-    elif head_x == tail_x and abs(head_y - tail_y) == 2:  # Move tail vertically
-        tail_pos[0], tail_pos[1] = tail_x, tail_y + sign(head_y - tail_y)
+                if visited[knot] is not None:
+                    visited[knot].add((x << 32) + y)  # Packed position - unique while |y| < 2 ** 31
 
-    elif abs(head_x - tail_x) == 1 and abs(head_y - tail_y) == 2:  # Move tail diagonally - case 1
-        tail_pos[0], tail_pos[1] = head_x, tail_y + sign(head_y - tail_y)
+    return [len(visited[knot]) for knot in tracked_knots]
 
-    elif abs(head_x - tail_x) == 2 and abs(head_y - tail_y) == 1:  # Move tail diagonally - case 2
-        tail_pos[0], tail_pos[1] = tail_x + sign(head_x - tail_x), head_y
 
-    elif abs(head_x - tail_x) == 2 and abs(head_y - tail_y) == 2:  # Move tail diagonally - case 3
-        tail_pos[0], tail_pos[1] = tail_x + sign(head_x - tail_x), tail_y + sign(head_y - tail_y)
+def tail_visits_by_rope_length(moves: List[tuple[int, int, int]], max_knots: int) -> dict[int, int]:
+    """
+    Number of positions visited by the tail, for every rope length from 2 to max_knots knots
+    A single max_knots simulation tracks every knot, with knot k standing in for the tail of a (k + 1)-knot rope
+
+    :param moves: Head moves as (dx, dy, num_steps)
+    :param max_knots: Number of knots in the longest rope
+    :return: dict[int, int] - Maps number of knots in the rope to the number of positions its tail visits
+    """
+    knots = tuple(range(1, max_knots))
+    return {knot + 1: count for knot, count in zip(knots, simulate_rope(moves, max_knots, tracked_knots=knots))}
 
 
-def move_rope_with_n_knots(num_knots: int) -> int:
+def move_rope_with_n_knots(num_knots: int, moves: List[tuple[int, int, int]] | None = None) -> int:
     """
     Parts 1 and 2 Solution - Generic function for n knots in the rope:
     Moves are processed iteratively with each movement propagated down all the knots in the rope
     Each knot acts as the head for the next knot along the rope
 
     :param num_knots: Number of nots in the rope
+    :param moves: Head moves as (dx, dy, num_steps) - read from the input file if not given
     :return: int - Number of positions traced by the rope tail at least once
     """
-    direction_map = {'U': [0, 1], 'D': [0, -1], 'R': [1, 0], 'L': [-1, 0]}
-    directions_to_follow = get_directions()  # Read directions from input file
+    if moves is None:
+        moves = parse_moves(get_directions())
 
-    # Maps knots (0..num_knots-1) to curr pos as (x, y) with knot 0 considered as the head
-    knot_positions = {i: [0, 0] for i in range(num_knots)}
-    positions_traced_by_tail = set()
-
-    for curr_dir, num_moves in directions_to_follow:
-        x, y = direction_map[curr_dir]
-
-        for _ in range(num_moves):
-            # Move rope head
-            head_pos = knot_positions[0]
-            head_pos[0], head_pos[1] = head_pos[0] + x, head_pos[1] + y
-            knot_positions[0] = head_pos
-
-            # Move all knots following the head
-            for knot_num in range(1, num_knots):
-                prev_knot_pos = knot_positions[knot_num - 1]
-                curr_knot_pos = knot_positions[knot_num]
-                update_rope_knot_pos(prev_knot_pos, curr_knot_pos)
-                knot_positions[knot_num] = curr_knot_pos
-
-            # Add tail position to positions traced
-            tail_pos = knot_positions[num_knots - 1]
-            positions_traced_by_tail.add((tail_pos[0], tail_pos[1]))
-
-    return len(positions_traced_by_tail)
+    return simulate_rope(moves, num_knots, tracked_knots=(num_knots - 1,))[0]
 
 
 if __name__ == "__main__":
-    part1_sol = move_rope_with_n_knots(num_knots=2)
+    # Parts 1 and 2 in one pass: the second knot of the ten-knot rope is the tail of the two-knot rope
+    head_moves = parse_moves(get_directions())
+    part1_sol, part2_sol = simulate_rope(head_moves, num_knots=10, tracked_knots=(1, 9))
+
     print(f"Simulate your complete hypothetical series of motions."
           f"\nHow many positions does the tail of the rope visit at least once?"
           f"\nAnswer: {part1_sol}")
 
-    part2_sol = move_rope_with_n_knots(num_knots=10)
     print(f"Simulate your complete series of motions on a larger rope with ten knots."
           f"\nHow many positions does the tail of the rope visit at least once?"
           f"\nAnswer: {part2_sol}")